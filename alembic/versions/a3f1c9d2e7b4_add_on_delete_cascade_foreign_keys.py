@@ -0,0 +1,67 @@
+"""add on delete cascade foreign keys
+
+Revision ID: a3f1c9d2e7b4
+Revises: c1a2b3d4e5f6
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d2e7b4'
+down_revision: Union[str, Sequence[str], None] = 'c1a2b3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, referred table, referred column, ondelete)
+FOREIGN_KEYS = [
+    ('scenarios', 'project_id', 'projects', 'project_id', 'CASCADE'),
+    ('risks', 'project_id', 'projects', 'project_id', 'CASCADE'),
+    ('assumptions', 'project_id', 'projects', 'project_id', 'CASCADE'),
+    ('conversation_logs', 'project_id', 'projects', 'project_id', 'CASCADE'),
+    ('project_inputs', 'project_id', 'projects', 'project_id', 'CASCADE'),
+    ('project_versions', 'project_id', 'projects', 'project_id', 'CASCADE'),
+    ('milestones', 'scenario_id', 'scenarios', 'scenario_id', 'CASCADE'),
+    # Tasks outlive their scenario/milestone, matching the previous ORM behaviour
+    ('tasks', 'scenario_id', 'scenarios', 'scenario_id', 'SET NULL'),
+    ('tasks', 'milestone_id', 'milestones', 'milestone_id', 'SET NULL'),
+    ('task_dependencies', 'task_id', 'tasks', 'id', 'CASCADE'),
+    ('task_dependencies', 'depends_on_task_id', 'tasks', 'id', 'CASCADE'),
+]
+
+# Child columns that Postgres scans when cascading a project delete
+CASCADE_INDEXES = [
+    ('scenarios', 'project_id'),
+    ('risks', 'project_id'),
+    ('assumptions', 'project_id'),
+    ('conversation_logs', 'project_id'),
+    ('project_inputs', 'project_id'),
+    ('project_versions', 'project_id'),
+    ('milestones', 'scenario_id'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column, referred_table, referred_column, ondelete in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred_table, [column], [referred_column], ondelete=ondelete)
+
+    for table, column in CASCADE_INDEXES:
+        op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in reversed(CASCADE_INDEXES):
+        op.drop_index(op.f(f'ix_{table}_{column}'), table_name=table)
+
+    for table, column, referred_table, referred_column, _ in reversed(FOREIGN_KEYS):
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred_table, [column], [referred_column])
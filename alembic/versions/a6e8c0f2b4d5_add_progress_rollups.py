@@ -0,0 +1,65 @@
+"""add progress rollups
+
+Revision ID: a6e8c0f2b4d5
+Revises: f5d7b9e1a3c4
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6e8c0f2b4d5'
+down_revision: Union[str, Sequence[str], None] = 'f5d7b9e1a3c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = ('task_count', 'tasks_done', 'duration_total', 'duration_done')
+
+# Same counts as core.progress's reconciler
+TOTALS = """
+    count(t.id) AS tasks,
+    count(t.id) FILTER (WHERE t.status IN ('done', 'completed')) AS done,
+    coalesce(sum(greatest(t.duration_days, 0)), 0) AS duration,
+    coalesce(sum(greatest(t.duration_days, 0)) FILTER (WHERE t.status IN ('done', 'completed')), 0) AS duration_done
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('projects', 'milestones'):
+        for column in COUNTERS:
+            op.add_column(table, sa.Column(column, sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(f"""
+        UPDATE milestones m
+        SET task_count = c.tasks, tasks_done = c.done, duration_total = c.duration, duration_done = c.duration_done
+        FROM (
+            SELECT t.milestone_id, {TOTALS}
+            FROM tasks t
+            WHERE t.milestone_id IS NOT NULL
+            GROUP BY t.milestone_id
+        ) c
+        WHERE m.milestone_id = c.milestone_id
+    """)
+    op.execute(f"""
+        UPDATE projects p
+        SET task_count = c.tasks, tasks_done = c.done, duration_total = c.duration, duration_done = c.duration_done
+        FROM (
+            SELECT s.project_id, {TOTALS}
+            FROM tasks t
+            JOIN scenarios s ON s.scenario_id = t.scenario_id
+            GROUP BY s.project_id
+        ) c
+        WHERE p.project_id = c.project_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('milestones', 'projects'):
+        for column in reversed(COUNTERS):
+            op.drop_column(table, column)
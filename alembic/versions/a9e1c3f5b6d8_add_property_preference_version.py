@@ -0,0 +1,28 @@
+"""add property preference version
+
+Revision ID: a9e1c3f5b6d8
+Revises: f8d0b2e4a5c7
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e1c3f5b6d8'
+down_revision: Union[str, Sequence[str], None] = 'f8d0b2e4a5c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('property_preferences', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('property_preferences', 'version')
@@ -0,0 +1,40 @@
+"""convert project properties to jsonb
+
+Revision ID: b4e2d8f0a1c3
+Revises: a3f1c9d2e7b4
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e2d8f0a1c3'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c9d2e7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('projects', 'properties',
+               existing_type=sa.JSON(),
+               type_=postgresql.JSONB(astext_type=sa.Text()),
+               existing_nullable=False,
+               existing_server_default=sa.text("'{}'::json"),
+               server_default=sa.text("'{}'::jsonb"),
+               postgresql_using='properties::jsonb')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('projects', 'properties',
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               type_=sa.JSON(),
+               existing_nullable=False,
+               existing_server_default=sa.text("'{}'::jsonb"),
+               server_default=sa.text("'{}'::json"),
+               postgresql_using='properties::json')
@@ -0,0 +1,28 @@
+"""add projects user_id updated_at index
+
+Revision ID: c5a7e9b1d2f4
+Revises: b4e2d8f0a1c3
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a7e9b1d2f4'
+down_revision: Union[str, Sequence[str], None] = 'b4e2d8f0a1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves count/max(updated_at) for list ETags as an index-only scan
+    op.create_index('ix_projects_user_id_updated_at', 'projects', ['user_id', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projects_user_id_updated_at', table_name='projects')
@@ -0,0 +1,38 @@
+"""add task scope indexes
+
+Revision ID: d3b5f7c9e1a2
+Revises: c2a4e6b8d0f1
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3b5f7c9e1a2'
+down_revision: Union[str, Sequence[str], None] = 'c2a4e6b8d0f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (scope, position, id) serves both the scope filter and keyset pagination;
+    # position is coalesce(order_index, max int) so unordered tasks sort last
+    op.create_index('ix_tasks_scenario_id_position', 'tasks',
+                    ['scenario_id', sa.text('coalesce(order_index, 2147483647)'), 'id'], unique=False)
+    op.create_index('ix_tasks_milestone_id_position', 'tasks',
+                    ['milestone_id', sa.text('coalesce(order_index, 2147483647)'), 'id'], unique=False)
+    op.create_index(op.f('ix_task_dependencies_task_id'), 'task_dependencies', ['task_id'], unique=False)
+    op.create_index(op.f('ix_task_dependencies_depends_on_task_id'), 'task_dependencies', ['depends_on_task_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_task_dependencies_depends_on_task_id'), table_name='task_dependencies')
+    op.drop_index(op.f('ix_task_dependencies_task_id'), table_name='task_dependencies')
+    op.drop_index('ix_tasks_milestone_id_position', table_name='tasks')
+    op.drop_index('ix_tasks_scenario_id_position', table_name='tasks')
@@ -0,0 +1,42 @@
+"""add project search vector
+
+Revision ID: d6b8f0c2e3a5
+Revises: c5a7e9b1d2f4
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6b8f0c2e3a5'
+down_revision: Union[str, Sequence[str], None] = 'c5a7e9b1d2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce(properties ->> 'project_title', '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(properties ->> 'short_summary', '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(properties ->> 'description', '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('projects', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        nullable=True
+    ))
+    op.create_index('ix_projects_search_vector', 'projects', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projects_search_vector', table_name='projects', postgresql_using='gin')
+    op.drop_column('projects', 'search_vector')
@@ -0,0 +1,28 @@
+"""add scenario plan version
+
+Revision ID: e4c6a8d0f2b3
+Revises: d3b5f7c9e1a2
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c6a8d0f2b3'
+down_revision: Union[str, Sequence[str], None] = 'd3b5f7c9e1a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('scenarios', sa.Column('plan_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('scenarios', 'plan_version')
@@ -0,0 +1,49 @@
+"""add project dependencies table
+
+Revision ID: e7c9a1d3f4b6
+Revises: d6b8f0c2e3a5
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c9a1d3f4b6'
+down_revision: Union[str, Sequence[str], None] = 'd6b8f0c2e3a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('project_dependencies',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('depends_on_project_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.project_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['depends_on_project_id'], ['projects.project_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id', 'depends_on_project_id')
+    )
+    op.create_index(op.f('ix_project_dependencies_depends_on_project_id'), 'project_dependencies', ['depends_on_project_id'], unique=False)
+
+    # Backfill from properties.dependencies, keeping only existing projects of the same owner
+    op.execute("""
+        INSERT INTO project_dependencies (project_id, depends_on_project_id)
+        SELECT DISTINCT p.project_id, d.project_id
+        FROM projects p
+        CROSS JOIN LATERAL jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(p.properties -> 'dependencies') = 'array'
+                 THEN p.properties -> 'dependencies' ELSE '[]'::jsonb END
+        ) AS dep(value)
+        JOIN projects d ON d.project_id::text = dep.value AND d.user_id = p.user_id
+        WHERE d.project_id <> p.project_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_project_dependencies_depends_on_project_id'), table_name='project_dependencies')
+    op.drop_table('project_dependencies')
@@ -0,0 +1,80 @@
+"""use fractional ranks for ordering
+
+Revision ID: f5d7b9e1a3c4
+Revises: e4c6a8d0f2b3
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5d7b9e1a3c4'
+down_revision: Union[str, Sequence[str], None] = 'e4c6a8d0f2b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
+
+def backfill_ranks(table: str, id_column: str) -> None:
+    # The n-th row of each scenario (by order_index, unordered last) gets the integer key
+    # 'd' + n in four base-62 digits, a valid key in core.ordering's format
+    digits = " || ".join(f"substr('{DIGITS}', (n / {62 ** power} % 62)::int + 1, 1)" for power in (3, 2, 1, 0))
+    op.execute(f"""
+        UPDATE {table}
+        SET rank = 'd' || {digits}
+        FROM (
+            SELECT {id_column} AS row_id,
+                   row_number() OVER (PARTITION BY scenario_id ORDER BY order_index NULLS LAST, {id_column}) - 1 AS n
+            FROM {table}
+        ) ordered
+        WHERE {table}.{id_column} = ordered.row_id
+    """)
+
+
+def backfill_order_index(table: str, id_column: str) -> None:
+    op.execute(f"""
+        UPDATE {table}
+        SET order_index = ordered.n
+        FROM (
+            SELECT {id_column} AS row_id,
+                   row_number() OVER (PARTITION BY scenario_id ORDER BY rank, {id_column}) - 1 AS n
+            FROM {table}
+        ) ordered
+        WHERE {table}.{id_column} = ordered.row_id
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, id_column in (('tasks', 'id'), ('milestones', 'milestone_id')):
+        op.add_column(table, sa.Column('rank', sa.String(collation='C'), server_default='a0', nullable=False))
+        backfill_ranks(table, id_column)
+        op.alter_column(table, 'rank', server_default=None)
+
+    op.drop_index('ix_tasks_milestone_id_position', table_name='tasks')
+    op.drop_index('ix_tasks_scenario_id_position', table_name='tasks')
+    op.drop_column('tasks', 'order_index')
+    op.drop_column('milestones', 'order_index')
+    op.create_index('ix_tasks_scenario_id_rank', 'tasks', ['scenario_id', 'rank', 'id'], unique=False)
+    op.create_index('ix_tasks_milestone_id_rank', 'tasks', ['milestone_id', 'rank', 'id'], unique=False)
+    op.create_index('ix_milestones_scenario_id_rank', 'milestones', ['scenario_id', 'rank', 'milestone_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_milestones_scenario_id_rank', table_name='milestones')
+    op.drop_index('ix_tasks_milestone_id_rank', table_name='tasks')
+    op.drop_index('ix_tasks_scenario_id_rank', table_name='tasks')
+    for table, id_column in (('tasks', 'id'), ('milestones', 'milestone_id')):
+        op.add_column(table, sa.Column('order_index', sa.Integer(), nullable=True))
+        backfill_order_index(table, id_column)
+        op.drop_column(table, 'rank')
+    op.create_index('ix_tasks_scenario_id_position', 'tasks',
+                    ['scenario_id', sa.text('coalesce(order_index, 2147483647)'), 'id'], unique=False)
+    op.create_index('ix_tasks_milestone_id_position', 'tasks',
+                    ['milestone_id', sa.text('coalesce(order_index, 2147483647)'), 'id'], unique=False)
@@ -0,0 +1,32 @@
+"""add project version payloads
+
+Revision ID: f8d0b2e4a5c7
+Revises: e7c9a1d3f4b6
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8d0b2e4a5c7'
+down_revision: Union[str, Sequence[str], None] = 'e7c9a1d3f4b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('project_versions', sa.Column('is_checkpoint', sa.Boolean(), server_default='false', nullable=False))
+    op.add_column('project_versions', sa.Column('payload', sa.LargeBinary(), nullable=True))
+    op.create_unique_constraint('uq_project_version_number', 'project_versions', ['project_id', 'version_number'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_project_version_number', 'project_versions', type_='unique')
+    op.drop_column('project_versions', 'payload')
+    op.drop_column('project_versions', 'is_checkpoint')
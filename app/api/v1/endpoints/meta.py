@@ -1,41 +1,141 @@
-from fastapi import APIRouter, HTTPException, Depends, Body
+from datetime import datetime
+from typing import Optional
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Body, Header, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy import select, delete, text, bindparam
+from sqlalchemy.dialects.postgresql import JSONB, insert
 from core.database import get_db
-from core.property_registry import get_entity_schema, apply_user_preferences
+from core.cache import LRUCache
+from core.http_cache import compute_etag, etag_matches, etag_headers, not_modified
+from core.property_registry import PROPERTIES_REGISTRY, TenantSchema, get_frozen_schema, get_property_keys
+from core.custom_properties import (
+    custom_property_definition, load_tenant_schema, publish_schema_change, forget_tenant_schema
+)
 from api.deps import get_current_user
 from models.user import User
 from models.preference import PropertyPreference
+from models.custom_property import CustomProperty
 
 router = APIRouter()
 
+# (entity_type, registry version, custom fingerprint) -> each property of that schema, encoded
+# once and shared by every user who sees it
+encoded_schema_cache = LRUCache(maxsize=1_000)
+# (user_id, entity_type) -> (preference version, {property key: visible}): just the user's overlay
+overlay_cache = LRUCache(maxsize=10_000)
+
+def encoded_properties(schema: TenantSchema) -> tuple[bytes, ...]:
+    cache_key = (schema.entity_type, schema.registry_version, schema.fingerprint)
+    encoded = encoded_schema_cache.get(cache_key)
+    if encoded is None:
+        encoded = tuple(orjson.dumps(dict(prop)) for prop in schema.properties)
+        encoded_schema_cache.set(cache_key, encoded)
+    return encoded
+
+def render_schema(schema: TenantSchema, overlay: dict[str, bool]) -> bytes:
+    """The frozen schema as JSON with the overlay merged in; only overridden properties are re-encoded."""
+    parts = []
+    for prop, encoded in zip(schema.properties, encoded_properties(schema)):
+        key = prop.get("key")
+        if key in overlay and overlay[key] != prop.get("visible"):
+            parts.append(orjson.dumps({**prop, "visible": overlay[key]}))
+        else:
+            parts.append(encoded)
+    return b"[" + b",".join(parts) + b"]"
+
 @router.get("/schemas/{entity_type}")
 async def get_schema(
     entity_type: str,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Returns the property schema for the given entity type, personalized with user preferences.
+    Includes the user's custom properties. Only the preference version is read per request:
+    the ETag is derived from it and the schema versions. The user's visibility overlay is
+    cached per preference version and merged into the shared, pre-encoded schema.
     """
-    schema = get_entity_schema(entity_type)
-    if not schema:
+    if not get_frozen_schema(entity_type):
         return []
+    schema = await load_tenant_schema(db, current_user.id, entity_type)
     
-    # Query PropertyPreference for this user and entity type
-    query = select(PropertyPreference).where(
-        PropertyPreference.user_id == current_user.id,
-        PropertyPreference.entity_type == entity_type
+    result = await db.execute(
+        select(PropertyPreference.version).where(
+            PropertyPreference.user_id == current_user.id,
+            PropertyPreference.entity_type == entity_type
+        )
     )
-    result = await db.execute(query)
-    user_pref_record = result.scalars().first()
+    stamp = (result.scalar_one_or_none() or 0, schema.registry_version, schema.fingerprint)
+    etag = compute_etag(current_user.id, entity_type, *stamp)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     
-    entity_prefs = user_pref_record.preferences if user_pref_record else {}
+    cache_key = (current_user.id, entity_type)
+    cached = overlay_cache.get(cache_key)
+    if cached is None or cached[0] != stamp[0]:
+        entity_prefs = {}
+        if stamp[0]:
+            result = await db.execute(
+                select(PropertyPreference.preferences).where(
+                    PropertyPreference.user_id == current_user.id,
+                    PropertyPreference.entity_type == entity_type
+                )
+            )
+            entity_prefs = result.scalar_one_or_none() or {}
+        overlay = {key: pref["visible"] for key, pref in entity_prefs.items() if pref and "visible" in pref}
+        cached = (stamp[0], overlay)
+        overlay_cache.set(cache_key, cached)
     
-    personalized_schema = apply_user_preferences(schema, entity_prefs)
-    
-    return personalized_schema
+    return Response(content=render_schema(schema, cached[1]), media_type="application/json", headers=etag_headers(etag))
+
+async def upsert_property_preferences(
+    db: AsyncSession,
+    user_id: int,
+    entity_type: str,
+    changes: list[dict]
+) -> dict:
+    """
+    Applies [{"key": ..., "visible": ...}, ...] to the user's preferences in one statement.
+    Each key's entry is merged into the stored one inside the UPDATE, so concurrent
+    toggles of different (or the same) keys never overwrite each other. Raises 400/404.
+    """
+    schema = await load_tenant_schema(db, user_id, entity_type)
+    known_keys = set(get_property_keys(entity_type, schema))
+
+    patch = {}
+    for change in changes:
+        prop_key = change.get("key")
+        if not prop_key:
+            raise HTTPException(status_code=400, detail="Property key is required")
+        if prop_key not in known_keys:
+            raise HTTPException(status_code=404, detail=f"Property '{prop_key}' not found for entity '{entity_type}'")
+        entry = patch.setdefault(prop_key, {})
+        if "visible" in change:
+            entry["visible"] = change["visible"]
+
+    result = await db.execute(
+        text("""
+            INSERT INTO property_preferences (user_id, entity_type, preferences, version)
+            VALUES (:user_id, :entity_type, :patch, 1)
+            ON CONFLICT (user_id, entity_type) DO UPDATE SET
+                preferences = coalesce(property_preferences.preferences, '{}'::jsonb) || (
+                    SELECT jsonb_object_agg(
+                        p.key,
+                        coalesce(property_preferences.preferences -> p.key, '{}'::jsonb) || p.value
+                    )
+                    FROM jsonb_each(EXCLUDED.preferences) AS p
+                ),
+                version = property_preferences.version + 1
+            RETURNING preferences
+        """).bindparams(bindparam("patch", type_=JSONB)),
+        {"user_id": user_id, "entity_type": entity_type, "patch": patch}
+    )
+    preferences = result.scalar_one()
+    await db.commit()
+    overlay_cache.pop((user_id, entity_type))
+    return preferences
 
 @router.patch("/schemas/{entity_type}/properties")
 async def update_property_preference(
@@ -47,47 +147,96 @@ async def update_property_preference(
     """
     Update a user's preference for a specific property.
     """
-    prop_key = preference.get("key")
-    if not prop_key:
-         raise HTTPException(status_code=400, detail="Property key is required")
-         
-    # Validate that property exists in registry
-    schema = get_entity_schema(entity_type)
-    if not any(p["key"] == prop_key for p in schema):
-        raise HTTPException(status_code=404, detail=f"Property '{prop_key}' not found for entity '{entity_type}'")
-
-    # Fetch existing preference or create new one
-    query = select(PropertyPreference).where(
-        PropertyPreference.user_id == current_user.id,
-        PropertyPreference.entity_type == entity_type
+    preferences = await upsert_property_preferences(db, current_user.id, entity_type, [preference])
+    return {"status": "success", "preferences": preferences}
+
+@router.patch("/schemas/{entity_type}/properties/batch")
+async def update_property_preferences(
+    entity_type: str,
+    changes: list[dict] = Body(...), # Expecting [{"key": "status", "visible": false}, ...]
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update several property preferences at once (e.g. toggling many columns).
+    """
+    if not changes:
+        raise HTTPException(status_code=400, detail="At least one change is required")
+    preferences = await upsert_property_preferences(db, current_user.id, entity_type, changes)
+    return {"status": "success", "preferences": preferences}
+
+@router.get("/properties/{entity_type}")
+async def list_custom_properties(
+    entity_type: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Lists the current user's custom properties for an entity type."""
+    result = await db.execute(
+        select(CustomProperty.key, CustomProperty.definition)
+        .where(CustomProperty.user_id == current_user.id, CustomProperty.entity_type == entity_type)
+        .order_by(CustomProperty.id)
     )
-    result = await db.execute(query)
-    user_pref_record = result.scalars().first()
-    
-    if not user_pref_record:
-        user_pref_record = PropertyPreference(
-            user_id=current_user.id,
-            entity_type=entity_type,
-            preferences={}
+    return [{**definition, "key": key} for key, definition in result]
+
+@router.put("/properties/{entity_type}/{key}")
+async def put_custom_property(
+    entity_type: str,
+    key: str,
+    definition: dict = Body(...), # Expecting {"type": "select", "label": "Team", "options": [...]}
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Creates or replaces one of the user's custom properties. Every worker drops its cached
+    schema for this user when the change commits, so it applies to the next request.
+    """
+    try:
+        stored = custom_property_definition(entity_type, key, definition)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    now = datetime.utcnow()
+    await db.execute(
+        insert(CustomProperty)
+        .values(
+            user_id=current_user.id, entity_type=entity_type, key=key,
+            definition=stored, created_at=now, updated_at=now
         )
-        db.add(user_pref_record)
-        await db.flush()  # Ensure the INSERT is flushed before we mutate preferences
-    
-    # Update the preferences dict
-    # We must ensure we're working with a mutable dict or re-assigning it
-    current_prefs = dict(user_pref_record.preferences) if user_pref_record.preferences else {}
-    
-    if prop_key not in current_prefs:
-        current_prefs[prop_key] = {}
-        
-    if "visible" in preference:
-        current_prefs[prop_key]["visible"] = preference["visible"]
-        
-    # Re-assign and explicitly flag as modified to force SQLAlchemy to detect the JSON change
-    user_pref_record.preferences = current_prefs
-    flag_modified(user_pref_record, "preferences")
-    
+        .on_conflict_do_update(
+            constraint="uq_custom_property_key",
+            set_={"definition": stored, "updated_at": now}
+        )
+    )
+    await publish_schema_change(db, current_user.id, entity_type)
     await db.commit()
-    await db.refresh(user_pref_record)
-    
-    return {"status": "success", "preferences": user_pref_record.preferences}
+    forget_tenant_schema(current_user.id, entity_type)
+
+    return {**stored, "key": key}
+
+@router.delete("/properties/{entity_type}/{key}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_custom_property(
+    entity_type: str,
+    key: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Removes a custom property from the schema. Values already stored on entities are kept."""
+    if entity_type not in PROPERTIES_REGISTRY:
+        raise HTTPException(status_code=404, detail=f"Unknown entity type '{entity_type}'")
+
+    result = await db.execute(
+        delete(CustomProperty)
+        .where(
+            CustomProperty.user_id == current_user.id,
+            CustomProperty.entity_type == entity_type,
+            CustomProperty.key == key
+        )
+        .returning(CustomProperty.id)
+    )
+    if result.first() is None:
+        raise HTTPException(status_code=404, detail=f"Custom property '{key}' not found")
+
+    await publish_schema_change(db, current_user.id, entity_type)
+    await db.commit()
+    forget_tenant_schema(current_user.id, entity_type)
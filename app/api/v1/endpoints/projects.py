@@ -1,30 +1,407 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+import base64
+import io
+import json
+import jsonpatch
+from itertools import islice
+from typing import Literal, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Header, Query, UploadFile
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from core.database import get_db
-from models.project import Project
+from sqlalchemy import select, delete, func, any_, bindparam, tuple_, literal, Integer, Float
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from core.database import get_db, AsyncSessionLocal
+from core.export import encode_ndjson, encode_csv, zstd_compress
+from core.versioning import project_state, record_version, load_version_state
+from core.project_import import (
+    IMPORT_CHUNK_SIZE, MAX_REPORTED_ERRORS, read_ndjson, read_csv, validate_chunk,
+    create_staging_table, copy_to_staging, merge_staging
+)
+from core.property_registry import PropertyType, GROUPABLE_PROPERTY_TYPES, TenantSchema, get_property_keys, get_property
+from core.property_factory import validate_properties
+from core.custom_properties import load_tenant_schema
+from core.http_cache import compute_etag, etag_matches, etag_headers, not_modified
+from core.board_events import board_event_stream
+from core.cache import LRUCache
+from core.dag import IncrementalDAG, CycleError
+from core.project_dependencies import (
+    parse_dependency_ids, load_dependency_graph, take_dependency_graph, lock_dependency_graph,
+    set_project_dependencies, remember_dependency_graph
+)
 from models.project import Project
+from models.version import ProjectVersion
+from models.scenario import Scenario
+from models.conversation import ConversationLog
 from models.user import User
-from schemas.project import ProjectResponse, ProjectCreate, ProjectUpdate
+from schemas.project import (
+    ProjectResponse, ProjectCreate, ProjectUpdate, ProjectAggregateResponse,
+    ProjectSearchResponse, ProjectDependencies, ProjectDependencyGraph, ProjectImportResult,
+    ProjectVersionResponse, ProjectVersionState, ProjectVersionDiff, ProjectFullResponse,
+    trusted_project_response
+)
 from api.deps import get_current_user
 
 router = APIRouter()
 
+# user_id -> {group_by key: (stamp, groups)}; dropped on this user's project writes.
+# The stamp check also catches writes handled by other workers.
+aggregate_cache = LRUCache(maxsize=10_000)
+
+async def get_projects_stamp(db: AsyncSession, user_id: int) -> tuple[int, Optional[datetime]]:
+    """count + max(updated_at) of a user's projects; an index-only scan on (user_id, updated_at)."""
+    result = await db.execute(
+        select(func.count(), func.max(Project.updated_at))
+        .where(Project.user_id == user_id)
+    )
+    return tuple(result.one())
+
+# Denormalized rollup read alongside each project row, so lists show progress without joining tasks
+PROJECT_PROGRESS_COLUMNS = (Project.task_count, Project.tasks_done, Project.duration_total, Project.duration_done)
+
+def parse_fields(fields: Optional[str], schema: TenantSchema) -> Optional[tuple[str, ...]]:
+    """
+    Parses a comma separated `fields` query parameter into a sorted tuple of property keys.
+    Raises 400 for keys that are not in the user's project schema.
+    """
+    if not fields:
+        return None
+    
+    requested = {key.strip() for key in fields.split(",") if key.strip()}
+    unknown = requested - set(get_property_keys("project", schema))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown project properties: {', '.join(sorted(unknown))}")
+    
+    return tuple(sorted(requested))
+
 @router.get("/", response_model=list[ProjectResponse])
 async def list_projects(
     skip: int = 0, 
     limit: int = 100, 
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """
+    Lists the current user's projects.
+    `fields=status,priority` returns only those property keys; the subset is built in SQL
+    so unselected properties (e.g. description) are never read off the row.
+    Supports If-None-Match: the ETag comes from count + max(updated_at), so an unchanged
+    list costs one aggregate over the (user_id, updated_at) index.
+    Rows are serialized on the trusted path (no re-validation) with orjson.
+    """
+    schema = await load_tenant_schema(db, current_user.id, "project")
+    field_keys = parse_fields(fields, schema)
+    
+    count, last_updated = await get_projects_stamp(db, current_user.id)
+    etag = compute_etag(current_user.id, count, last_updated, skip, limit, field_keys, schema.fingerprint)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    properties = Project.properties
+    if field_keys is not None:
+        # jsonb_build_object('status', properties -> 'status', ...)
+        properties = func.jsonb_build_object(
+            *[arg for key in field_keys for arg in (key, Project.properties[key])]
+        )
     result = await db.execute(
-        select(Project)
+        select(
+            Project.project_id,
+            Project.user_id,
+            properties.label("properties"),
+            Project.lead_id,
+            Project.created_at,
+            Project.updated_at,
+            *PROJECT_PROGRESS_COLUMNS,
+        )
         .where(Project.user_id == current_user.id)
         .offset(skip)
         .limit(limit)
     )
-    projects = result.scalars().all()
-    return projects
+    
+    return ORJSONResponse(
+        [trusted_project_response(row, field_keys, schema) for row in result.mappings()],
+        headers=etag_headers(etag)
+    )
+
+@router.get("/aggregate", response_model=ProjectAggregateResponse)
+async def aggregate_projects(
+    group_by: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Counts the current user's projects per value of each `group_by` property
+    (comma separated, e.g. `status,priority,labels`). Multi-select properties count
+    each element. Results are cached per user and revalidated against the projects stamp.
+    """
+    schema = await load_tenant_schema(db, current_user.id, "project")
+    keys = [key.strip() for key in group_by.split(",") if key.strip()]
+    prop_types = {}
+    for key in keys:
+        prop = get_property("project", key, schema)
+        if prop is None or prop["type"] not in GROUPABLE_PROPERTY_TYPES:
+            raise HTTPException(status_code=400, detail=f"Cannot group projects by '{key}'")
+        prop_types[key] = prop["type"]
+
+    stamp = await get_projects_stamp(db, current_user.id)
+    cached = aggregate_cache.get(current_user.id)
+    if cached is None:
+        cached = {}
+        aggregate_cache.set(current_user.id, cached)
+
+    groups = {}
+    for key in keys:
+        entry = cached.get(key)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, await count_projects_by(db, current_user.id, key, prop_types[key]))
+            cached[key] = entry
+        groups[key] = entry[1]
+
+    return {"groups": groups}
+
+async def count_projects_by(db: AsyncSession, user_id: int, key: str, prop_type: PropertyType) -> list[dict]:
+    if prop_type == PropertyType.MULTI_SELECT:
+        # One row per array element, then group the elements
+        elements = (
+            select(func.jsonb_array_elements_text(Project.properties[key]).label("value"))
+            .where(Project.user_id == user_id)
+            .where(func.jsonb_typeof(Project.properties[key]) == "array")
+            .subquery()
+        )
+        query = select(elements.c.value, func.count().label("count")).group_by(elements.c.value)
+    else:
+        value = Project.properties[key].astext
+        query = (
+            select(value.label("value"), func.count().label("count"))
+            .where(Project.user_id == user_id)
+            .group_by(value)
+        )
+
+    result = await db.execute(query.order_by(func.count().desc()))
+    return [{"value": row.value, "count": row.count} for row in result]
+
+def validated_custom_properties(schema: TenantSchema, properties: dict) -> dict:
+    """
+    Request models only know the registry and let other keys through; this checks the
+    user's custom properties against their schema. Returns only the keys that were given.
+    """
+    if not schema.fingerprint:
+        return properties
+    try:
+        return validate_properties("project", properties, schema)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+def validated_dependency_ids(values) -> list[int]:
+    try:
+        return parse_dependency_ids(values)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def take_locked_dependency_graph(db: AsyncSession, user_id: int) -> IncrementalDAG:
+    """Takes the user's dependency lock, then their graph out of the cache (see `take_dependency_graph`)."""
+    await lock_dependency_graph(db, user_id)
+    return await take_dependency_graph(db, user_id)
+
+async def sync_dependency_graph(
+    db: AsyncSession,
+    user_id: int,
+    project_id: int,
+    dependency_ids: list[int],
+    graph: Optional[IncrementalDAG] = None
+) -> IncrementalDAG:
+    """
+    Checks the new dependencies against the user's cached graph (incremental cycle check)
+    and writes the edge rows. The graph is taken out of the cache meanwhile; the caller
+    commits through `commit_with_dependency_graph`, which puts it back. A caller that
+    inserts the project first passes the graph it took before the insert.
+    """
+    if graph is None:
+        graph = await take_locked_dependency_graph(db, user_id)
+    new_project = project_id not in graph
+    try:
+        await set_project_dependencies(db, graph, project_id, dependency_ids)
+    except ValueError as e:
+        # Rejected before the graph was touched
+        remember_dependency_graph(user_id, graph)
+        raise HTTPException(status_code=400, detail=str(e))
+    except CycleError as e:
+        if new_project:
+            # The insert is rolled back with the request
+            graph.remove_node(project_id)
+        remember_dependency_graph(user_id, graph)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Dependencies would create a cycle", "cycle": e.path}
+        )
+    return graph
+
+async def commit_with_dependency_graph(db: AsyncSession, user_id: int, graph: Optional[IncrementalDAG]) -> None:
+    """Commits, then caches the graph `sync_dependency_graph` updated. If the commit fails it stays out of the cache."""
+    await db.commit()
+    if graph is not None:
+        remember_dependency_graph(user_id, graph)
+
+@router.get("/dependency-graph", response_model=ProjectDependencyGraph)
+async def get_dependency_graph(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    The user's whole project dependency graph in topological order
+    (every project comes after the projects it depends on).
+    """
+    graph = await load_dependency_graph(db, current_user.id)
+    return {
+        "order": graph.topological_order(),
+        "edges": [{"project_id": v, "depends_on_project_id": u} for u, v in graph.edges],
+    }
+
+EXPORT_COLUMNS = ["project_id", "user_id", "lead_id", "created_at", "updated_at"]
+
+@router.get("/export")
+async def export_projects(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    compress: Optional[Literal["zstd"]] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Streams all of the user's projects as NDJSON or CSV, with properties flattened
+    into one column per schema key (custom properties included). Rows come from a server-side cursor so memory
+    stays flat regardless of the export size.
+    """
+    user_id = current_user.id
+    schema = await load_tenant_schema(db, user_id, "project")
+
+    async def rows():
+        # Own session: the stream outlives the request-scoped one
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(
+                select(*[getattr(Project, column) for column in EXPORT_COLUMNS], Project.properties)
+                .where(Project.user_id == user_id)
+                .order_by(Project.project_id)
+                .execution_options(yield_per=1000)
+            )
+            async for row in result.mappings():
+                yield row
+
+    encode = encode_ndjson if export_format == "ndjson" else encode_csv
+    body = encode("project", rows(), EXPORT_COLUMNS, schema)
+    media_type = "application/x-ndjson" if export_format == "ndjson" else "text/csv"
+    filename = f"projects.{export_format}"
+    if compress == "zstd":
+        body = zstd_compress(body)
+        media_type = "application/zstd"
+        filename += ".zst"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/import", response_model=ProjectImportResult)
+async def import_projects(
+    file: UploadFile,
+    import_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Bulk-creates projects from an NDJSON or CSV upload (the export layouts are accepted).
+    Rows are validated in chunks, COPY'd into a temp staging table and merged into
+    projects with a single INSERT ... SELECT. Invalid rows are skipped and reported.
+    """
+    schema = await load_tenant_schema(db, current_user.id, "project")
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    records = read_ndjson(stream) if import_format == "ndjson" else read_csv("project", stream, schema)
+    errors = []
+
+    await create_staging_table(db)
+    try:
+        while chunk := list(islice(records, IMPORT_CHUNK_SIZE)):
+            await copy_to_staging(db, validate_chunk("project", chunk, errors, schema))
+    except UnicodeDecodeError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Upload must be UTF-8 encoded")
+
+    imported = await merge_staging(db, current_user.id)
+    await db.commit()
+    aggregate_cache.pop(current_user.id)
+
+    return {"imported": imported, "error_count": len(errors), "errors": errors[:MAX_REPORTED_ERRORS]}
+
+def encode_search_cursor(rank: float, project_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([rank, project_id]).encode()).decode()
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        rank, project_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), int(project_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/search", response_model=ProjectSearchResponse)
+async def search_projects(
+    q: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Full-text search over project title, summary and description using the
+    GIN-indexed `search_vector` column. Results are ordered by rank and paged
+    with a keyset cursor on (rank, project_id).
+    """
+    query = func.websearch_to_tsquery("english", q)
+    rank = func.ts_rank_cd(Project.search_vector, query)
+
+    page = (
+        select(Project.project_id, Project.properties, rank.label("rank"))
+        .where(Project.user_id == current_user.id)
+        .where(Project.search_vector.op("@@")(query))
+    )
+    if cursor:
+        last_rank, last_id = decode_search_cursor(cursor)
+        page = page.where(
+            tuple_(rank, Project.project_id) < tuple_(literal(last_rank, Float), literal(last_id, Integer))
+        )
+    page = page.order_by(rank.desc(), Project.project_id.desc()).limit(limit + 1).subquery()
+
+    # Headlines are expensive, so only compute them for the page we return
+    headline = func.ts_headline(
+        "english",
+        func.coalesce(
+            page.c.properties["description"].astext,
+            page.c.properties["short_summary"].astext,
+            page.c.properties["project_title"].astext
+        ),
+        query,
+        "MaxFragments=2, MinWords=5, MaxWords=20"
+    )
+    result = await db.execute(
+        select(
+            page.c.project_id,
+            page.c.properties["project_title"].astext.label("project_title"),
+            page.c.rank,
+            headline.label("headline"),
+        ).order_by(page.c.rank.desc(), page.c.project_id.desc())
+    )
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_search_cursor(rows[-1].rank, rows[-1].project_id)
+
+    return {"items": [row._asdict() for row in rows], "next_cursor": next_cursor}
 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
@@ -40,30 +417,89 @@ async def create_project(
     # Ensure properties is a dict for JSONB
     if 'properties' in project_data and hasattr(project_data['properties'], 'model_dump'):
          project_data['properties'] = project_data['properties'].model_dump()
+    schema = await load_tenant_schema(db, current_user.id, "project")
+    project_data['properties'] = validated_custom_properties(schema, project_data['properties'])
+    
+    dependency_ids = validated_dependency_ids(project_data['properties'].get('dependencies'))
+    project_data['properties']['dependencies'] = dependency_ids
     
     db_project = Project(**project_data)
+    graph = None
+    if dependency_ids:
+        # Before the insert, while the cached graph still matches the tables
+        graph = await take_locked_dependency_graph(db, current_user.id)
             
     db.add(db_project)
-    await db.commit()
+    await db.flush()
+    if graph is not None:
+        graph = await sync_dependency_graph(db, current_user.id, db_project.project_id, dependency_ids, graph)
+    await record_version(db, db_project)
+    await commit_with_dependency_graph(db, current_user.id, graph)
+    aggregate_cache.pop(current_user.id)
     await db.refresh(db_project)
     return db_project
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: int, 
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(Project).where(Project.project_id == project_id))
-    project = result.scalars().first()
-    if project is None:
+    # Probe ownership and freshness first so a matching If-None-Match never reads properties
+    result = await db.execute(
+        select(Project.user_id, Project.updated_at).where(Project.project_id == project_id)
+    )
+    meta = result.first()
+    if meta is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Check authorization
-    if project.user_id != current_user.id:
+    if meta.user_id != current_user.id:
          raise HTTPException(status_code=403, detail="Not authorized to access this project")
 
-    return project
+    schema = await load_tenant_schema(db, current_user.id, "project")
+    etag = compute_etag(project_id, meta.updated_at.isoformat(), schema.fingerprint)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    result = await db.execute(
+        select(
+            Project.project_id,
+            Project.user_id,
+            Project.properties,
+            Project.lead_id,
+            Project.created_at,
+            Project.updated_at,
+            *PROJECT_PROGRESS_COLUMNS,
+        ).where(Project.project_id == project_id)
+    )
+    project = result.mappings().first()
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # Tag what we actually return, in case the row changed since the probe
+    return ORJSONResponse(
+        trusted_project_response(project, schema=schema),
+        headers=etag_headers(compute_etag(project_id, project["updated_at"].isoformat(), schema.fingerprint))
+    )
+
+@router.get("/{project_id}/dependencies", response_model=ProjectDependencies)
+async def get_project_dependencies(
+    project_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Transitive upstream (what this project waits on) and downstream (what waits on it) projects."""
+    graph = await load_dependency_graph(db, current_user.id)
+    if project_id not in graph:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    return {
+        "project_id": project_id,
+        "upstream": sorted(graph.ancestors(project_id), key=graph.ord.__getitem__),
+        "downstream": sorted(graph.descendants(project_id), key=graph.ord.__getitem__),
+    }
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
@@ -72,7 +508,8 @@ async def update_project(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(Project).where(Project.project_id == project_id))
+    # Row lock: concurrent updates would otherwise race on the merge and the version number
+    result = await db.execute(select(Project).where(Project.project_id == project_id).with_for_update())
     db_project = result.scalars().first()
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -80,8 +517,10 @@ async def update_project(
     if db_project.user_id != current_user.id:
          raise HTTPException(status_code=403, detail="Not authorized to update this project")
     
+    previous_state = project_state(db_project)
     update_data = project_update.model_dump(exclude_unset=True)
     
+    graph = None
     if 'properties' in update_data:
         # Merge new properties with existing ones
         existing_props = dict(db_project.properties) if db_project.properties else {}
@@ -90,6 +529,12 @@ async def update_project(
         # If it's a model, dump it
         if hasattr(new_props, 'model_dump'):
             new_props = new_props.model_dump(exclude_unset=True)
+        schema = await load_tenant_schema(db, current_user.id, "project")
+        new_props = validated_custom_properties(schema, new_props)
+        
+        if 'dependencies' in new_props:
+            new_props['dependencies'] = validated_dependency_ids(new_props['dependencies'])
+            graph = await sync_dependency_graph(db, current_user.id, project_id, new_props['dependencies'])
             
         existing_props.update(new_props)
         # Reassign to trigger update
@@ -101,28 +546,157 @@ async def update_project(
     # Update other fields (like lead_id)
     for key, value in update_data.items():
         setattr(db_project, key, value)
-        
-    await db.commit()
+    
+    await record_version(db, db_project, previous_state)
+    await commit_with_dependency_graph(db, current_user.id, graph)
+    aggregate_cache.pop(current_user.id)
     await db.refresh(db_project)
     return db_project
 
+async def check_project_access(db: AsyncSession, project_id: int, user_id: int) -> None:
+    result = await db.execute(select(Project.user_id).where(Project.project_id == project_id))
+    owner_id = result.scalar_one_or_none()
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if owner_id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this project")
+
+@router.get("/{project_id}/events")
+async def stream_project_events(
+    project_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Live task board updates as server-sent events, instead of polling: `changes` carries
+    small merged deltas of the project's tasks, milestones and scenarios (see
+    core.board_events), `resync` asks the client to refetch after deltas were dropped
+    (slow client or lost listener connection). A burst of writes arrives as one event.
+    """
+    await check_project_access(db, project_id, current_user.id)
+    # The stream may stay open for hours; don't hold a pooled connection for it
+    await db.close()
+    return StreamingResponse(
+        board_event_stream(project_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{project_id}/full", response_model=ProjectFullResponse)
+async def get_project_full(
+    project_id: int,
+    log_limit: int = Query(50, ge=0, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    A project with its scenarios (milestones and tasks), risks, assumptions and most
+    recent conversation logs. Each relationship is one selectin query, so the number
+    of round trips is fixed however large the project is.
+    """
+    result = await db.execute(
+        select(Project)
+        .where(Project.project_id == project_id)
+        .where(Project.user_id == current_user.id)
+        .options(
+            selectinload(Project.scenarios).selectinload(Scenario.milestones),
+            selectinload(Project.scenarios).selectinload(Scenario.tasks),
+            selectinload(Project.risks),
+            selectinload(Project.assumptions),
+        )
+    )
+    project = result.scalars().first()
+    if project is None:
+        await check_project_access(db, project_id, current_user.id)
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # Only the latest logs; attach them without triggering a lazy load of the full history
+    result = await db.execute(
+        select(ConversationLog)
+        .where(ConversationLog.project_id == project_id)
+        .order_by(ConversationLog.created_at.desc())
+        .limit(log_limit)
+    )
+    set_committed_value(project, "conversation_logs", list(result.scalars().all()))
+
+    return project
+
+@router.get("/{project_id}/versions", response_model=list[ProjectVersionResponse])
+async def list_project_versions(
+    project_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    await check_project_access(db, project_id, current_user.id)
+    result = await db.execute(
+        select(
+            ProjectVersion.version_number,
+            ProjectVersion.change_summary,
+            ProjectVersion.is_checkpoint,
+            ProjectVersion.created_at,
+        )
+        .where(ProjectVersion.project_id == project_id)
+        .order_by(ProjectVersion.version_number.desc())
+    )
+    return [row._asdict() for row in result]
+
+@router.get("/{project_id}/versions/{version_number}", response_model=ProjectVersionState)
+async def get_project_version(
+    project_id: int,
+    version_number: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    await check_project_access(db, project_id, current_user.id)
+    state = await load_version_state(db, project_id, version_number)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return {"version_number": version_number, "state": state}
+
+@router.get("/{project_id}/versions/{from_version}/diff/{to_version}", response_model=ProjectVersionDiff)
+async def diff_project_versions(
+    project_id: int,
+    from_version: int,
+    to_version: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """JSON Patch turning `from_version` into `to_version`."""
+    await check_project_access(db, project_id, current_user.id)
+    old_state = await load_version_state(db, project_id, from_version)
+    new_state = await load_version_state(db, project_id, to_version)
+    if old_state is None or new_state is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return {
+        "from_version": from_version,
+        "to_version": to_version,
+        "patch": jsonpatch.make_patch(old_state, new_state).patch,
+    }
+
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
     project_id: int, 
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(Project).where(Project.project_id == project_id))
-    project = result.scalars().first()
+    # Single DELETE; child rows are removed by ON DELETE CASCADE in Postgres
+    result = await db.execute(
+        delete(Project)
+        .where(Project.project_id == project_id)
+        .where(Project.user_id == current_user.id)
+        .returning(Project.project_id)
+        .execution_options(synchronize_session=False)
+    )
     
-    if project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
-        
-    if project.user_id != current_user.id:
-         raise HTTPException(status_code=403, detail="Not authorized to delete this project")
+    if result.scalar_one_or_none() is None:
+        # Nothing deleted: tell "missing" apart from "not yours"
+        owner = await db.execute(select(Project.user_id).where(Project.project_id == project_id))
+        if owner.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        raise HTTPException(status_code=403, detail="Not authorized to delete this project")
          
-    await db.delete(project)
     await db.commit()
+    aggregate_cache.pop(current_user.id)
     return None
 
 @router.post("/batch-delete", status_code=status.HTTP_204_NO_CONTENT)
@@ -131,16 +705,14 @@ async def batch_delete_projects(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Fetch all projects to be deleted to ensure ownership and existence
-    result = await db.execute(
-        select(Project)
-        .where(Project.project_id.in_(project_ids))
+    # One set-based DELETE scoped to the caller; ids they don't own are ignored
+    await db.execute(
+        delete(Project)
+        .where(Project.project_id == any_(bindparam("ids", project_ids, type_=ARRAY(Integer))))
         .where(Project.user_id == current_user.id)
+        .execution_options(synchronize_session=False)
     )
-    projects = result.scalars().all()
-    
-    for project in projects:
-        await db.delete(project)
     
     await db.commit()
+    aggregate_cache.pop(current_user.id)
     return None
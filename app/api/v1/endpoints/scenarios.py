@@ -0,0 +1,218 @@
+from datetime import datetime, timedelta
+from typing import Optional
+import numpy as np
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from core.database import get_db
+from core.critical_path import (
+    CriticalPath, bump_plan_version, lock_plan, get_critical_path, save_critical_path, remember_critical_path,
+    carry_critical_path
+)
+from core.board_events import publish_board_events, milestone_event, scenario_event
+from core.dag import CycleError
+from core.forecast import (
+    DEFAULT_SAMPLES, MAX_SAMPLES, MAX_SIMULATED_CELLS, forecast_finish_days, load_forecast_plan,
+    milestone_titles, percentile_dates
+)
+from core.http_cache import compute_etag, etag_matches, etag_headers, not_modified
+from core.ordering import MAX_RANK_LENGTH, rank_next_to, rebalance_ranks
+from core.timeline import get_cached_timeline, load_timeline, remember_timeline
+from models.scenario import Scenario, Milestone
+from models.project import Project
+from models.user import User
+from schemas.scenario import CriticalPathResponse, ScenarioForecastResponse, MilestoneResponse
+from schemas.task import MoveRequest
+from api.deps import get_current_user
+
+router = APIRouter()
+
+async def check_scenario_access(db: AsyncSession, scenario_id: int, user_id: int) -> None:
+    result = await db.execute(
+        select(Project.user_id)
+        .join(Scenario, Scenario.project_id == Project.project_id)
+        .where(Scenario.scenario_id == scenario_id)
+    )
+    owner_id = result.scalar_one_or_none()
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    if owner_id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this scenario")
+
+def critical_path_response(scenario_id: int, schedule: CriticalPath) -> dict:
+    slack = schedule.slack
+    return {
+        "scenario_id": scenario_id,
+        "start_date": schedule.start,
+        "end_date": schedule.start + timedelta(days=schedule.finish),
+        "duration_days": schedule.finish,
+        "critical_path": schedule.critical_path(),
+        "tasks": [
+            {
+                "task_id": task_id,
+                "earliest_start": schedule.es[task_id],
+                "earliest_finish": schedule.ef[task_id],
+                "latest_start": schedule.ls[task_id],
+                "latest_finish": schedule.lf[task_id],
+                "slack": slack[task_id],
+                "critical": slack[task_id] == 0,
+            }
+            for task_id in schedule.graph.topological_order()
+        ],
+    }
+
+@router.post("/{scenario_id}/critical-path", response_model=CriticalPathResponse)
+async def compute_critical_path(
+    scenario_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Runs the critical path method over the scenario's tasks and writes their estimated
+    dates and critical flags back (only rows that changed), plus the scenario end date.
+    """
+    await check_scenario_access(db, scenario_id, current_user.id)
+    version, start = await lock_plan(db, scenario_id)
+    try:
+        schedule, _ = await get_critical_path(db, scenario_id, version, start)
+    except CycleError as e:
+        raise HTTPException(status_code=409, detail={"message": "Task dependencies form a cycle", "cycle": e.path})
+
+    if await save_critical_path(db, scenario_id, schedule):
+        await publish_board_events(db, scenario_id, [scenario_event("rescheduled", scenario_id)])
+    await db.commit()
+    remember_critical_path(scenario_id, version, schedule)
+    return critical_path_response(scenario_id, schedule)
+
+@router.get("/{scenario_id}/forecast", response_model=ScenarioForecastResponse)
+async def forecast_scenario(
+    scenario_id: int,
+    samples: int = Query(DEFAULT_SAMPLES, ge=100, le=MAX_SAMPLES),
+    seed: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Monte Carlo completion forecast. Each task's duration is drawn from a triangular
+    distribution between its optimistic, realistic (this scenario) and pessimistic
+    estimates; all samples are propagated through the dependency graph at once.
+    Pass `seed` for reproducible results. `samples` times the number of tasks is capped
+    (400 beyond it); the simulation runs in the thread pool.
+    """
+    await check_scenario_access(db, scenario_id, current_user.id)
+    result = await db.execute(select(Scenario).where(Scenario.scenario_id == scenario_id))
+    scenario = result.scalar_one()
+    start = scenario.estimated_start_date or datetime.utcnow().date()
+
+    try:
+        plan = await load_forecast_plan(db, scenario)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if samples * len(plan.task_ids) > MAX_SIMULATED_CELLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"samples x tasks may not exceed {MAX_SIMULATED_CELLS}; "
+                   f"use at most {MAX_SIMULATED_CELLS // len(plan.task_ids)} samples for this scenario"
+        )
+    milestones = await milestone_titles(db, scenario_id)
+
+    finish, milestone_finish = await run_in_threadpool(forecast_finish_days, plan, samples, seed)
+    empty = np.zeros(samples, dtype=np.float32)
+    return {
+        "scenario_id": scenario_id,
+        "samples": samples,
+        "start_date": start,
+        "finish": percentile_dates(start, finish),
+        "milestones": [
+            {
+                "milestone_id": milestone_id,
+                "title": title,
+                **percentile_dates(start, milestone_finish.get(milestone_id, empty)),
+            }
+            for milestone_id, title in milestones
+        ],
+    }
+
+@router.post("/{scenario_id}/milestones/{milestone_id}/move", response_model=MilestoneResponse)
+async def move_milestone(
+    scenario_id: int,
+    milestone_id: int,
+    move: MoveRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Places the milestone directly before or after another milestone of the scenario,
+    writing only its own rank (see `move_task`).
+    """
+    if (move.before_id is None) == (move.after_id is None):
+        raise HTTPException(status_code=400, detail="Pass exactly one of before_id or after_id")
+    anchor_id = move.before_id if move.before_id is not None else move.after_id
+    if anchor_id == milestone_id:
+        raise HTTPException(status_code=400, detail="A milestone cannot be moved next to itself")
+
+    await check_scenario_access(db, scenario_id, current_user.id)
+    # Milestone order shapes the timeline lanes, so this is a plan change like a task move
+    version, _ = await bump_plan_version(db, scenario_id)
+    result = await db.execute(
+        select(Milestone)
+        .where(Milestone.scenario_id == scenario_id)
+        .where(Milestone.milestone_id.in_((milestone_id, anchor_id)))
+    )
+    milestones = {milestone.milestone_id: milestone for milestone in result.scalars()}
+    missing = {milestone_id, anchor_id} - milestones.keys()
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Milestone {min(missing)} not found in this scenario")
+
+    milestone = milestones[milestone_id]
+    milestone.rank = await rank_next_to(
+        db,
+        Milestone.rank,
+        (Milestone.scenario_id == scenario_id) & (Milestone.milestone_id != milestone_id),
+        milestones[anchor_id].rank,
+        before=move.before_id is not None,
+    )
+    await publish_board_events(db, scenario_id, [milestone_event("update", milestone_id, {"rank": milestone.rank})])
+    await db.commit()
+    carry_critical_path(scenario_id, version)
+    if len(milestone.rank) > MAX_RANK_LENGTH:
+        background_tasks.add_task(rebalance_ranks, Milestone, Milestone.milestone_id, scenario_id)
+    return milestone
+
+@router.get("/{scenario_id}/timeline")
+async def get_timeline(
+    scenario_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Everything a Gantt chart needs in one columnar body: tasks in display order as parallel
+    arrays (id, title, status, start/end in days from start_date, critical, lane = index of
+    the task's milestone, or one past the last milestone if it has none), dependencies as
+    parallel `from`/`to` arrays of task positions, and each milestone's span.
+    Cached per scenario and validated by its plan version (also the ETag); task writes
+    patch the cached layout instead of dropping it.
+    """
+    await check_scenario_access(db, scenario_id, current_user.id)
+    result = await db.execute(
+        select(Scenario.plan_version, Scenario.estimated_start_date).where(Scenario.scenario_id == scenario_id)
+    )
+    row = result.one()
+    version, start = row.plan_version, row.estimated_start_date or datetime.utcnow().date()
+    etag = compute_etag(scenario_id, version, start)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    timeline = get_cached_timeline(scenario_id, version, start)
+    if timeline is None:
+        try:
+            schedule, _ = await get_critical_path(db, scenario_id, version, start)
+        except CycleError as e:
+            raise HTTPException(status_code=409, detail={"message": "Task dependencies form a cycle", "cycle": e.path})
+        timeline = await load_timeline(db, scenario_id, schedule)
+        remember_critical_path(scenario_id, version, schedule)
+        remember_timeline(scenario_id, version, timeline)
+    return Response(content=timeline.body(), media_type="application/json", headers=etag_headers(etag))
@@ -1,22 +1,638 @@
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import json
+from datetime import date
+from typing import Iterable, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Body
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, delete, tuple_, literal, Integer, String
 from core.database import get_db
+from core.critical_path import (
+    bump_plan_version, get_critical_path, load_critical_path, save_critical_path, remember_critical_path,
+    carry_critical_path, peek_critical_path
+)
+from core.board_events import publish_board_events, task_event, scenario_event
+from core.dag import IncrementalDAG, CycleError
+from core.ordering import MAX_RANK_LENGTH, rank_at_end, rank_next_to, rebalance_ranks
+from core.progress import ProgressDelta, apply_progress
+from core.task_graph import MAX_IMPACT_DEPTH, walk_dependencies
+from core.timeline import take_timeline, remember_timeline
 from models.task import Task
-from schemas.task import TaskResponse, TaskCreate
+from models.task_dependency import TaskDependency
+from models.scenario import Scenario, Milestone
+from models.project import Project
+from models.user import User
+from schemas.task import (
+    TaskResponse, TaskCreate, TaskUpdate, TaskPage, TaskBulkCreate, TaskBulkResult, TaskDependencies, MoveRequest,
+    TaskImpact, TaskImpactItem
+)
+from api.deps import get_current_user
 
 router = APIRouter()
 
-@router.get("/", response_model=list[TaskResponse])
-async def list_tasks(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Task))
-    tasks = result.scalars().all()
-    return tasks
+# Tasks accepted by one bulk request
+MAX_BULK_TASKS = 2_000
+
+def encode_task_cursor(rank: str, task_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([rank, task_id]).encode()).decode()
+
+def decode_task_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        rank, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(rank, str):
+            raise ValueError(rank)
+        return rank, int(task_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def check_task_scope_access(
+    db: AsyncSession,
+    user_id: int,
+    project_id: Optional[int] = None,
+    scenario_id: Optional[int] = None,
+    milestone_id: Optional[int] = None
+) -> None:
+    """404 if the project/scenario/milestone doesn't exist, 403 if another user owns it."""
+    if milestone_id is not None:
+        query = (
+            select(Project.user_id)
+            .join(Scenario, Scenario.project_id == Project.project_id)
+            .join(Milestone, Milestone.scenario_id == Scenario.scenario_id)
+            .where(Milestone.milestone_id == milestone_id)
+        )
+    elif scenario_id is not None:
+        query = (
+            select(Project.user_id)
+            .join(Scenario, Scenario.project_id == Project.project_id)
+            .where(Scenario.scenario_id == scenario_id)
+        )
+    else:
+        query = select(Project.user_id).where(Project.project_id == project_id)
+
+    result = await db.execute(query)
+    owner_id = result.scalar_one_or_none()
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    if owner_id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access these tasks")
+
+@router.get("/", response_model=TaskPage)
+async def list_tasks(
+    project_id: Optional[int] = None,
+    scenario_id: Optional[int] = None,
+    milestone_id: Optional[int] = None,
+    status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Lists the tasks of exactly one project, scenario or milestone, ordered by (rank, id).
+    `status=pending,done` filters by status. Pages use a keyset cursor, so scenario and
+    milestone pages are a range scan on their (scope, rank, id) index. Project scope
+    covers the tasks of all its scenarios.
+    """
+    if sum(scope is not None for scope in (project_id, scenario_id, milestone_id)) != 1:
+        raise HTTPException(status_code=400, detail="Pass exactly one of project_id, scenario_id or milestone_id")
+    await check_task_scope_access(db, current_user.id, project_id, scenario_id, milestone_id)
+
+    query = select(Task)
+    if milestone_id is not None:
+        query = query.where(Task.milestone_id == milestone_id)
+    elif scenario_id is not None:
+        query = query.where(Task.scenario_id == scenario_id)
+    else:
+        query = query.join(Scenario, Scenario.scenario_id == Task.scenario_id).where(Scenario.project_id == project_id)
+
+    if status:
+        query = query.where(Task.status.in_([value.strip() for value in status.split(",") if value.strip()]))
+    if cursor:
+        last_rank, last_id = decode_task_cursor(cursor)
+        query = query.where(
+            tuple_(Task.rank, Task.id) > tuple_(literal(last_rank, String), literal(last_id, Integer))
+        )
+
+    result = await db.scalars(query.order_by(Task.rank, Task.id).limit(limit + 1))
+    tasks = result.all()
+
+    next_cursor = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        next_cursor = encode_task_cursor(tasks[-1].rank, tasks[-1].id)
+
+    return {"items": tasks, "next_cursor": next_cursor}
 
 @router.post("/", response_model=TaskResponse)
-async def create_task(task: TaskCreate, db: AsyncSession = Depends(get_db)):
+async def create_task(
+    task: TaskCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    await check_plan_access(
+        db, current_user.id, scenario_ids={task.scenario_id} - {None}, milestone_ids={task.milestone_id} - {None}
+    )
+    await check_milestone_scenarios(db, [(task.milestone_id, task.scenario_id)])
     db_task = Task(**task.model_dump())
+    if db_task.scenario_id is not None:
+        # Cached schedules of the scenario no longer cover all of its tasks
+        await bump_plan_version(db, db_task.scenario_id)
+        # New tasks go last; the scenario row lock taken above serializes appends
+        [db_task.rank] = await rank_at_end(db, Task.rank, Task.scenario_id == db_task.scenario_id)
+    progress = ProgressDelta()
+    progress.add(db_task.scenario_id, db_task.milestone_id, db_task.status, db_task.duration_days)
+    await apply_progress(db, progress)
     db.add(db_task)
+    await db.flush()
+    await publish_board_events(
+        db, db_task.scenario_id, [task_event("create", db_task.id, TaskResponse.model_validate(db_task).model_dump())]
+    )
+    await db.commit()
+    await db.refresh(db_task)
+    return db_task
+
+async def check_plan_access(
+    db: AsyncSession,
+    user_id: int,
+    scenario_ids: Iterable[int] = (),
+    milestone_ids: Iterable[int] = (),
+    task_ids: Iterable[int] = ()
+) -> None:
+    """Every given scenario, milestone and task must exist (404) and belong to the user's projects (403)."""
+    checks = [
+        (Scenario.scenario_id, set(scenario_ids),
+         select(Scenario.scenario_id, Project.user_id).join(Project, Project.project_id == Scenario.project_id)),
+        (Milestone.milestone_id, set(milestone_ids),
+         select(Milestone.milestone_id, Project.user_id)
+         .join(Scenario, Scenario.scenario_id == Milestone.scenario_id)
+         .join(Project, Project.project_id == Scenario.project_id)),
+        (Task.id, set(task_ids),
+         select(Task.id, Project.user_id)
+         .join(Scenario, Scenario.scenario_id == Task.scenario_id)
+         .join(Project, Project.project_id == Scenario.project_id)),
+    ]
+    for column, ids, query in checks:
+        if not ids:
+            continue
+        result = await db.execute(query.where(column.in_(ids)))
+        owners = dict(result.all())
+        missing = ids - owners.keys()
+        if missing:
+            raise HTTPException(status_code=404, detail=f"{column.table.name} not found: {', '.join(map(str, sorted(missing)))}")
+        if any(owner_id != user_id for owner_id in owners.values()):
+            raise HTTPException(status_code=403, detail=f"Not authorized to access these {column.table.name}")
+
+async def check_milestone_scenarios(db: AsyncSession, pairs: Iterable[tuple[Optional[int], Optional[int]]]) -> None:
+    """Each (milestone_id, scenario_id) pair must name a milestone of that scenario (400). Pairs without a milestone pass."""
+    pairs = {(milestone_id, scenario_id) for milestone_id, scenario_id in pairs if milestone_id is not None}
+    if not pairs:
+        return
+    result = await db.execute(
+        select(Milestone.milestone_id, Milestone.scenario_id)
+        .where(Milestone.milestone_id.in_({milestone_id for milestone_id, _ in pairs}))
+    )
+    milestone_scenarios = dict(result.all())
+    for milestone_id, scenario_id in sorted(pairs, key=lambda pair: pair[0]):
+        if milestone_scenarios.get(milestone_id) != scenario_id:
+            raise HTTPException(status_code=400, detail=f"Milestone {milestone_id} is not in scenario {scenario_id}")
+
+@router.post("/bulk", response_model=TaskBulkResult, status_code=201)
+async def create_tasks_bulk(
+    plan: TaskBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Creates a whole plan in one transaction: tasks keyed by client-side `temp_id`,
+    and dependency edges (within one scenario) between temp ids and/or existing task ids.
+    Tasks go in with one multi-row INSERT ... RETURNING, edges with a second batched
+    INSERT once all of them passed a single cycle check per scenario (409 with the cycle).
+    """
+    if len(plan.tasks) > MAX_BULK_TASKS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_TASKS} tasks per request")
+    temp_ids = [task.temp_id for task in plan.tasks]
+    if len(set(temp_ids)) != len(temp_ids):
+        raise HTTPException(status_code=400, detail="Duplicate temp_id")
+
+    known = set(temp_ids)
+    for edge in plan.dependencies:
+        for ref in (edge.task, edge.depends_on):
+            if isinstance(ref, str) and ref not in known:
+                raise HTTPException(status_code=400, detail=f"Unknown temp_id '{ref}' in dependencies")
+        if edge.task == edge.depends_on:
+            raise HTTPException(status_code=400, detail=f"Task '{edge.task}' cannot depend on itself")
+
+    await check_plan_access(
+        db,
+        current_user.id,
+        scenario_ids={task.scenario_id for task in plan.tasks} - {None},
+        milestone_ids={task.milestone_id for task in plan.tasks} - {None},
+        task_ids={ref for edge in plan.dependencies for ref in (edge.task, edge.depends_on) if isinstance(ref, int)},
+    )
+    await check_milestone_scenarios(db, [(task.milestone_id, task.scenario_id) for task in plan.tasks])
+
+    existing_scenarios = await get_task_scenarios(
+        db, {ref for edge in plan.dependencies for ref in (edge.task, edge.depends_on) if isinstance(ref, int)}
+    )
+    scenario_of = {**existing_scenarios, **{task.temp_id: task.scenario_id for task in plan.tasks}}
+    for edge in plan.dependencies:
+        if scenario_of[edge.task] != scenario_of[edge.depends_on]:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Task '{edge.task}' and '{edge.depends_on}' are in different scenarios"
+            )
+
+    # Lock every scenario written to, in id order, before reading their last ranks: the
+    # scenario row lock serializes appends, so concurrent requests can't pick the same keys
+    plans = {}
+    for scenario_id in sorted(({task.scenario_id for task in plan.tasks} | set(scenario_of.values())) - {None}):
+        plans[scenario_id] = await bump_plan_version(db, scenario_id)
+
+    # New tasks go after each scenario's last task, in request order
+    rows = [task.model_dump(exclude={"temp_id"}) for task in plan.tasks]
+    progress = ProgressDelta()
+    for row in rows:
+        progress.add(row["scenario_id"], row["milestone_id"], row["status"], row["duration_days"])
+    await apply_progress(db, progress)
+    rows_by_scenario = {}
+    for row in rows:
+        if row["scenario_id"] is not None:
+            rows_by_scenario.setdefault(row["scenario_id"], []).append(row)
+    for scenario_id, scenario_rows in rows_by_scenario.items():
+        ranks = await rank_at_end(db, Task.rank, Task.scenario_id == scenario_id, len(scenario_rows))
+        for row, rank in zip(scenario_rows, ranks):
+            row["rank"] = rank
+
+    tasks = []
+    if rows:
+        # Parameter order is kept, so the returned rows line up with temp_ids
+        result = await db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), rows)
+        tasks = result.all()
+    ids = {temp_id: task.id for temp_id, task in zip(temp_ids, tasks)}
+
+    def resolve(ref):
+        return ids[ref] if isinstance(ref, str) else ref
+
+    # (depends_on, task) grouped by scenario, in topological-order terms
+    edges_by_scenario = {}
+    for edge in plan.dependencies:
+        edges_by_scenario.setdefault(scenario_of[edge.task], {})[(resolve(edge.depends_on), resolve(edge.task))] = None
+    tasks_by_scenario = {}
+    for task in tasks:
+        tasks_by_scenario.setdefault(task.scenario_id, {})[task.id] = task.duration_days
+
+    # Check every scenario's new edges against its maintained order before writing any of them
+    try:
+        if None in edges_by_scenario:
+            # Tasks outside scenarios can only depend on tasks created in this request
+            IncrementalDAG().add_edges(edges_by_scenario[None])
+        schedules = {}
+        for scenario_id in sorted((set(tasks_by_scenario) | set(edges_by_scenario)) - {None}):
+            version, start = plans[scenario_id]
+            schedule, cached = await get_critical_path(db, scenario_id, version - 1, start)
+            # Edges that already exist are neither re-checked nor inserted twice
+            scenario_edges = [edge for edge in edges_by_scenario.get(scenario_id, ()) if not schedule.graph.has_edge(*edge)]
+            edges_by_scenario[scenario_id] = scenario_edges
+            moved = schedule.add_dependencies(tasks_by_scenario.get(scenario_id, {}), scenario_edges)
+            schedules[scenario_id] = (version, schedule, moved if cached else None)
+    except CycleError as e:
+        raise HTTPException(status_code=409, detail={"message": "Task dependencies form a cycle", "cycle": e.path})
+
+    edges = [(task_id, depends_on) for scenario_edges in edges_by_scenario.values() for depends_on, task_id in scenario_edges]
+    if edges:
+        await db.execute(
+            insert(TaskDependency),
+            [{"task_id": task_id, "depends_on_task_id": depends_on} for task_id, depends_on in edges]
+        )
+
+    for scenario_id, (_, schedule, moved) in schedules.items():
+        await save_critical_path(db, scenario_id, schedule, moved)
+        await publish_board_events(db, scenario_id, [scenario_event("changed", scenario_id)])
+    await db.commit()
+    for scenario_id, (version, schedule, _) in schedules.items():
+        remember_critical_path(scenario_id, version, schedule)
+    return {"tasks": tasks, "ids": ids}
+
+async def get_task_scenarios(db: AsyncSession, task_ids: Iterable[int]) -> dict[int, Optional[int]]:
+    task_ids = set(task_ids)
+    if not task_ids:
+        return {}
+    result = await db.execute(select(Task.id, Task.scenario_id).where(Task.id.in_(task_ids)))
+    return dict(result.all())
+
+async def reschedule_scenarios(db: AsyncSession, plans: dict[int, tuple[int, date]]) -> None:
+    """
+    Schedules whole scenarios from scratch after structural changes. `plans` maps each
+    scenario to the (version, start) its `bump_plan_version` returned. Commits.
+    """
+    schedules = {}
+    for scenario_id, (version, start) in plans.items():
+        try:
+            schedule = await load_critical_path(db, scenario_id, start)
+        except CycleError as e:
+            raise HTTPException(status_code=409, detail={"message": "Task dependencies form a cycle", "cycle": e.path})
+        await save_critical_path(db, scenario_id, schedule)
+        schedules[scenario_id] = (version, schedule)
+
+    await db.commit()
+    for scenario_id, (version, schedule) in schedules.items():
+        remember_critical_path(scenario_id, version, schedule)
+
+async def lock_owned_task(
+    db: AsyncSession,
+    task_id: int,
+    user_id: int,
+    scenario_ids: Iterable[Optional[int]] = ()
+) -> tuple[Task, dict[int, tuple[int, date]]]:
+    """
+    Loads a task, which must belong to one of the user's scenarios, for a plan write.
+    The plan version of its scenario (and of `scenario_ids`) is bumped first, in id order:
+    every plan writer takes scenario row locks before it touches task rows, and the
+    scenario lock is what serializes writes to the task. Returns
+    (task, {scenario_id: (version, start)}).
+    """
+    result = await db.execute(
+        select(Task.scenario_id, Project.user_id)
+        .outerjoin(Scenario, Scenario.scenario_id == Task.scenario_id)
+        .outerjoin(Project, Project.project_id == Scenario.project_id)
+        .where(Task.id == task_id)
+    )
+    row = result.first()
+    if row is None or row.user_id is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if row.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this task")
+
+    plans = {}
+    for scenario_id in sorted({row.scenario_id, *scenario_ids} - {None}):
+        plans[scenario_id] = await bump_plan_version(db, scenario_id)
+    task = await db.scalar(select(Task).where(Task.id == task_id).execution_options(populate_existing=True))
+    if task is None or task.scenario_id != row.scenario_id:
+        # Moved to another scenario (or deleted) before we got its scenario's lock
+        raise HTTPException(status_code=409, detail="Task was changed concurrently, please retry")
+    return task, plans
+
+async def reschedule_task(db: AsyncSession, task: Task, version: int, start: date, change) -> None:
+    """
+    Applies `change(schedule)` (which returns the tasks it moved) to the scenario's cached
+    schedule and writes back only those tasks, after `bump_plan_version` returned
+    (version, start). Without a cached schedule the scenario is scheduled from scratch.
+    The cached timeline takes over the task and the moved dates. Commits.
+    """
+    scenario_id = task.scenario_id
+    timeline = take_timeline(scenario_id, version - 1, start)
+    try:
+        schedule, cached = await get_critical_path(db, scenario_id, version - 1, start)
+        moved = change(schedule)
+    except CycleError as e:
+        raise HTTPException(status_code=409, detail={"message": "Task dependencies form a cycle", "cycle": e.path})
+
+    await save_critical_path(db, scenario_id, schedule, moved if cached else None)
+    await db.commit()
+    remember_critical_path(scenario_id, version, schedule)
+    if timeline is not None:
+        timeline.set_task(task)
+        timeline.set_dates(schedule, moved if cached else None)
+    remember_timeline(scenario_id, version, timeline)
+
+async def commit_task_fields(db: AsyncSession, task: Task, version: int, start: date) -> None:
+    """
+    Commits a change to a task's own fields (not its duration, dependencies or scenario),
+    made after `bump_plan_version` returned (version, start): the cached schedule stays
+    valid under the new version and the cached timeline takes over the task.
+    """
+    timeline = take_timeline(task.scenario_id, version - 1, start)
     await db.commit()
+    carry_critical_path(task.scenario_id, version)
+    if timeline is not None:
+        timeline.set_task(task)
+    remember_timeline(task.scenario_id, version, timeline)
+
+@router.patch("/{task_id}", response_model=TaskResponse)
+async def update_task(
+    task_id: int,
+    task_update: TaskUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Updates a task. Duration changes reschedule only the tasks downstream of it;
+    moving the task to another scenario drops its dependencies and reschedules both scenarios.
+    """
+    update_data = task_update.model_dump(exclude_unset=True)
+    await check_plan_access(
+        db,
+        current_user.id,
+        scenario_ids={update_data.get("scenario_id")} - {None},
+        milestone_ids={update_data.get("milestone_id")} - {None},
+    )
+    # A target scenario is locked along with the current one, in id order
+    db_task, plans = await lock_owned_task(db, task_id, current_user.id, [update_data.get("scenario_id")])
+
+    previous_scenario_id = db_task.scenario_id
+    progress = ProgressDelta()
+    progress.remove(db_task.scenario_id, db_task.milestone_id, db_task.status, db_task.duration_days)
+    for key, value in update_data.items():
+        setattr(db_task, key, value)
+    if "milestone_id" in update_data or "scenario_id" in update_data:
+        await check_milestone_scenarios(db, [(db_task.milestone_id, db_task.scenario_id)])
+    progress.add(db_task.scenario_id, db_task.milestone_id, db_task.status, db_task.duration_days)
+    await apply_progress(db, progress)
+
+    changes = dict(update_data)
+    if db_task.scenario_id != previous_scenario_id:
+        if db_task.scenario_id is not None:
+            [db_task.rank] = await rank_at_end(db, Task.rank, Task.scenario_id == db_task.scenario_id)
+            changes["rank"] = db_task.rank
+        # Both boards see the task leave or arrive
+        for scenario_id in {previous_scenario_id, db_task.scenario_id} - {None}:
+            await publish_board_events(
+                db, scenario_id, [task_event("update", task_id, changes), scenario_event("rescheduled", scenario_id)]
+            )
+        # Dependencies only exist within a scenario
+        await db.execute(
+            delete(TaskDependency).where(
+                (TaskDependency.task_id == task_id) | (TaskDependency.depends_on_task_id == task_id)
+            )
+        )
+        await reschedule_scenarios(db, plans)
+    elif db_task.scenario_id is not None and "duration_days" in update_data:
+        await publish_board_events(
+            db,
+            db_task.scenario_id,
+            [task_event("update", task_id, changes), scenario_event("rescheduled", db_task.scenario_id)]
+        )
+        version, start = plans[db_task.scenario_id]
+        await reschedule_task(
+            db, db_task, version, start, lambda schedule: schedule.set_duration(task_id, db_task.duration_days)
+        )
+    elif db_task.scenario_id is not None:
+        # Timelines show titles, statuses and milestones, so this still counts as a plan change
+        version, start = plans[db_task.scenario_id]
+        await publish_board_events(db, db_task.scenario_id, [task_event("update", task_id, changes)])
+        await commit_task_fields(db, db_task, version, start)
+    else:
+        await db.commit()
+
     await db.refresh(db_task)
     return db_task
+
+@router.put("/{task_id}/dependencies", response_model=TaskDependencies)
+async def set_task_dependencies(
+    task_id: int,
+    depends_on: list[int] = Body(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Replaces the tasks this task depends on (all in its scenario) and reschedules what is
+    downstream of it. New edges are checked against the scenario's cached topological
+    order, which is usually a local check; 409 with the cycle if they would close one.
+    """
+    db_task, plans = await lock_owned_task(db, task_id, current_user.id)
+    wanted = list(dict.fromkeys(depends_on))
+    if task_id in wanted:
+        raise HTTPException(status_code=400, detail="A task cannot depend on itself")
+    await check_plan_access(db, current_user.id, task_ids=wanted)
+    scenarios = await get_task_scenarios(db, wanted)
+    other_scenarios = {dep for dep, scenario_id in scenarios.items() if scenario_id != db_task.scenario_id}
+    if other_scenarios:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tasks in other scenarios: {', '.join(map(str, sorted(other_scenarios)))}"
+        )
+
+    # Validate against the scenario's maintained order before touching the edge table
+    version, start = plans[db_task.scenario_id]
+    timeline = take_timeline(db_task.scenario_id, version - 1, start)
+    try:
+        schedule, cached = await get_critical_path(db, db_task.scenario_id, version - 1, start)
+        moved = schedule.set_predecessors(task_id, wanted)
+    except CycleError as e:
+        raise HTTPException(status_code=409, detail={"message": "Task dependencies form a cycle", "cycle": e.path})
+
+    result = await db.execute(select(TaskDependency.depends_on_task_id).where(TaskDependency.task_id == task_id))
+    current = set(result.scalars())
+    removed = current - set(wanted)
+    added = [dep for dep in wanted if dep not in current]
+    if removed:
+        await db.execute(
+            delete(TaskDependency)
+            .where(TaskDependency.task_id == task_id)
+            .where(TaskDependency.depends_on_task_id.in_(removed))
+        )
+    if added:
+        await db.execute(insert(TaskDependency), [{"task_id": task_id, "depends_on_task_id": dep} for dep in added])
+
+    await save_critical_path(db, db_task.scenario_id, schedule, moved if cached else None)
+    await publish_board_events(
+        db,
+        db_task.scenario_id,
+        [task_event("update", task_id, {"depends_on": wanted}), scenario_event("rescheduled", db_task.scenario_id)]
+    )
+    await db.commit()
+    remember_critical_path(db_task.scenario_id, version, schedule)
+    if timeline is not None:
+        timeline.set_predecessors(task_id, wanted)
+        timeline.set_dates(schedule, moved if cached else None)
+    remember_timeline(db_task.scenario_id, version, timeline)
+    return {"task_id": task_id, "depends_on": wanted}
+
+@router.post("/{task_id}/move", response_model=TaskResponse)
+async def move_task(
+    task_id: int,
+    move: MoveRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Places the task directly before or after another task of its scenario. The task gets
+    a rank between the anchor and the anchor's neighbour, so exactly one row is written
+    however long the list is. If that rank grew long, the scenario's ranks are rewritten
+    in the background.
+    """
+    if (move.before_id is None) == (move.after_id is None):
+        raise HTTPException(status_code=400, detail="Pass exactly one of before_id or after_id")
+    anchor_id = move.before_id if move.before_id is not None else move.after_id
+    if anchor_id == task_id:
+        raise HTTPException(status_code=400, detail="A task cannot be moved next to itself")
+
+    # The scenario lock also serializes moves within the scenario, so neighbours can't change under us
+    db_task, plans = await lock_owned_task(db, task_id, current_user.id)
+    version, start = plans[db_task.scenario_id]
+    result = await db.execute(
+        select(Task.rank).where(Task.id == anchor_id).where(Task.scenario_id == db_task.scenario_id)
+    )
+    anchor = result.scalar_one_or_none()
+    if anchor is None:
+        raise HTTPException(status_code=404, detail=f"Task {anchor_id} not found in this scenario")
+
+    db_task.rank = await rank_next_to(
+        db,
+        Task.rank,
+        (Task.scenario_id == db_task.scenario_id) & (Task.id != task_id),
+        anchor,
+        before=move.before_id is not None,
+    )
+    await publish_board_events(db, db_task.scenario_id, [task_event("update", task_id, {"rank": db_task.rank})])
+    await commit_task_fields(db, db_task, version, start)
+    if len(db_task.rank) > MAX_RANK_LENGTH:
+        background_tasks.add_task(rebalance_ranks, Task, Task.id, db_task.scenario_id)
+    return db_task
+
+async def get_task_impact(db: AsyncSession, task_id: int, user_id: int, upstream: bool, max_depth: int) -> dict:
+    """
+    Walks the scenario's adjacency lists in memory when its schedule is cached for the
+    current plan version (any recently edited or viewed scenario), else runs one recursive
+    CTE over task_dependencies. Either way the reached tasks are loaded in one query.
+    """
+    result = await db.execute(
+        select(Task.scenario_id, Scenario.plan_version, Project.user_id)
+        .join(Scenario, Scenario.scenario_id == Task.scenario_id)
+        .join(Project, Project.project_id == Scenario.project_id)
+        .where(Task.id == task_id)
+    )
+    row = result.first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if row.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this task")
+
+    schedule = peek_critical_path(row.scenario_id, row.plan_version)
+    if schedule is not None:
+        depths = schedule.graph.distances(task_id, upstream, max_depth)
+    else:
+        depths = await walk_dependencies(db, task_id, upstream, max_depth)
+
+    tasks = []
+    if depths:
+        result = await db.scalars(select(Task).where(Task.id.in_(depths)))
+        tasks = sorted(result.all(), key=lambda task: (depths[task.id], task.rank, task.id))
+    return {
+        "task_id": task_id,
+        "direction": "upstream" if upstream else "downstream",
+        "max_depth": max_depth,
+        "tasks": [
+            TaskImpactItem(**TaskResponse.model_validate(task).model_dump(), depth=depths[task.id]) for task in tasks
+        ],
+    }
+
+@router.get("/{task_id}/upstream", response_model=TaskImpact)
+async def get_task_upstream(
+    task_id: int,
+    max_depth: int = Query(MAX_IMPACT_DEPTH, ge=1, le=MAX_IMPACT_DEPTH),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Everything this task is blocked by, directly or transitively, up to `max_depth` edges away."""
+    return await get_task_impact(db, task_id, current_user.id, True, max_depth)
+
+@router.get("/{task_id}/downstream", response_model=TaskImpact)
+async def get_task_downstream(
+    task_id: int,
+    max_depth: int = Query(MAX_IMPACT_DEPTH, ge=1, le=MAX_IMPACT_DEPTH),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Everything blocked if this task slips, directly or transitively, up to `max_depth` edges away."""
+    return await get_task_impact(db, task_id, current_user.id, False, max_depth)
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.notifications import ChannelListener
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel carrying {"p": project_id, "e": [event, ...]} for task board changes.
+# An event is {"kind": "task" | "milestone" | "scenario", "id": ..., "op": ..., "fields": {...}}:
+# "create"/"update" carry the written fields only; an "update" without "fields" means the
+# row changed but its fields were too large to send (refetch the row). A scenario
+# "rescheduled" means its dates moved (refetch the timeline) and "changed" means many of
+# its rows did (refetch it).
+BOARD_CHANNEL = "task_board_changed"
+
+# NOTIFY payloads are limited to 8000 bytes; events are split across several below that
+MAX_NOTIFY_PAYLOAD = 7_000
+# Changes arriving within this window are sent to a client as one batch
+COALESCE_WINDOW = 0.2
+# Distinct rows a client may have pending; beyond that it is told to resync instead
+MAX_PENDING_EVENTS = 500
+# Seconds without changes before an SSE comment keeps the connection (and proxies) alive
+HEARTBEAT_INTERVAL = 15
+
+
+def merge_event(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Folds a newer event about the same row into a pending one, so bursts collapse to one delta."""
+    if old is None:
+        return new
+    if new["op"] == "update" and old["op"] in ("create", "update"):
+        if "fields" not in old or "fields" not in new:
+            # A refetch notice covers whatever the other side carried
+            return refetch_event(new)
+        return {**old, "fields": {**old["fields"], **new["fields"]}}
+    if old["op"] == "changed" and new["op"] == "rescheduled":
+        return old
+    return new
+
+
+class BoardSubscriber:
+    """
+    One connected client. Events are merged per row into `pending` rather than queued,
+    so a slow client holds at most MAX_PENDING_EVENTS deltas; past that they are dropped
+    and the client gets a single resync notice.
+    """
+
+    def __init__(self):
+        self.pending: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self.overflowed = False
+        self.ready = asyncio.Event()
+
+    def push(self, events: Iterable[Dict[str, Any]]) -> None:
+        for event in events:
+            if self.overflowed:
+                break
+            key = (event["kind"], event["id"])
+            if key not in self.pending and len(self.pending) >= MAX_PENDING_EVENTS:
+                self.overflowed = True
+                self.pending.clear()
+                break
+            self.pending[key] = merge_event(self.pending.get(key), event)
+        self.ready.set()
+
+    def resync(self) -> None:
+        self.overflowed = True
+        self.pending.clear()
+        self.ready.set()
+
+    async def next_batch(self, timeout: float) -> Optional[Tuple[bool, List[Dict[str, Any]]]]:
+        """Waits for changes and returns (resync, events) once a burst settled; None on timeout."""
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        await asyncio.sleep(COALESCE_WINDOW)
+        batch = (self.overflowed, list(self.pending.values()))
+        self.pending.clear()
+        self.overflowed = False
+        self.ready.clear()
+        return batch
+
+
+class BoardHub:
+    """
+    In-process fan-out of board events to the clients of each project. Delivering to a
+    project nobody watches here is a dict miss, but publishing is not free: every task
+    write runs a pg_notify round trip and takes NOTIFY's commit-time queue lock whether
+    or not any client is subscribed.
+    """
+
+    def __init__(self):
+        self.subscribers: Dict[int, Set[BoardSubscriber]] = {}
+
+    def subscribe(self, project_id: int) -> BoardSubscriber:
+        subscriber = BoardSubscriber()
+        self.subscribers.setdefault(project_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, project_id: int, subscriber: BoardSubscriber) -> None:
+        subscribers = self.subscribers.get(project_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.subscribers[project_id]
+
+    def publish(self, project_id: int, events: List[Dict[str, Any]]) -> None:
+        for subscriber in self.subscribers.get(project_id, ()):
+            subscriber.push(events)
+
+    def resync_all(self) -> None:
+        for subscribers in self.subscribers.values():
+            for subscriber in subscribers:
+                subscriber.resync()
+
+
+board_hub = BoardHub()
+
+
+def task_event(op: str, task_id: int, fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {"kind": "task", "id": task_id, "op": op, "fields": fields or {}}
+
+
+def milestone_event(op: str, milestone_id: int, fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {"kind": "milestone", "id": milestone_id, "op": op, "fields": fields or {}}
+
+
+def scenario_event(op: str, scenario_id: int) -> Dict[str, Any]:
+    return {"kind": "scenario", "id": scenario_id, "op": op}
+
+
+def refetch_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """The field-less "update" telling clients to refetch the event's row."""
+    return {"kind": event["kind"], "id": event["id"], "op": "update"}
+
+
+def split_events(events: List[Dict[str, Any]]) -> List[bytes]:
+    """
+    Encodes events as JSON arrays that each fit in a NOTIFY payload. An event too large to
+    fit on its own (e.g. a task with a long description) is sent as a refetch notice.
+    """
+    chunks, current, size = [], [], 2
+    for event in events:
+        encoded = orjson.dumps(event)
+        if len(encoded) + 2 > MAX_NOTIFY_PAYLOAD:
+            encoded = orjson.dumps(refetch_event(event))
+        if current and size + len(encoded) + 1 > MAX_NOTIFY_PAYLOAD:
+            chunks.append(b"[" + b",".join(current) + b"]")
+            current, size = [], 2
+        current.append(encoded)
+        size += len(encoded) + 1
+    if current:
+        chunks.append(b"[" + b",".join(current) + b"]")
+    return chunks
+
+
+async def publish_board_events(db: AsyncSession, scenario_id: Optional[int], events: List[Dict[str, Any]]) -> None:
+    """
+    Queues events for the board of the scenario's project. Postgres delivers them to every
+    worker when the transaction commits, and drops them if it rolls back. The project id
+    is looked up by the NOTIFY statement itself.
+    """
+    if scenario_id is None or not events:
+        return
+    for chunk in split_events(events):
+        await db.execute(
+            text("""
+                SELECT pg_notify(:channel, '{"p":' || project_id::text || ',"e":' || CAST(:events AS text) || '}')
+                FROM scenarios WHERE scenario_id = :scenario_id
+            """),
+            {"channel": BOARD_CHANNEL, "events": chunk.decode(), "scenario_id": scenario_id}
+        )
+
+
+def _on_board_event(connection, pid, channel, payload) -> None:
+    try:
+        message = orjson.loads(payload)
+        board_hub.publish(int(message["p"]), message["e"])
+    except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+        logger.warning(f"Ignoring malformed {BOARD_CHANNEL} payload: {payload[:200]!r}")
+
+
+# Every client resyncs whenever the listening connection is (re)established or lost
+board_listener = ChannelListener(BOARD_CHANNEL, _on_board_event, board_hub.resync_all)
+
+
+async def board_event_stream(project_id: int) -> AsyncIterator[bytes]:
+    """
+    Server-sent events for one client: a `changes` event per settled burst, `resync` when
+    deltas were lost (refetch the board), and a comment line as heartbeat while idle.
+    The subscription ends when the client disconnects and the generator is closed.
+    """
+    subscriber = board_hub.subscribe(project_id)
+    try:
+        yield b"event: ready\ndata: {}\n\n"
+        while True:
+            batch = await subscriber.next_batch(HEARTBEAT_INTERVAL)
+            if batch is None:
+                yield b": ping\n\n"
+                continue
+            resync, events = batch
+            if resync:
+                yield b"event: resync\ndata: {}\n\n"
+            elif events:
+                yield b"event: changes\ndata: " + orjson.dumps({"events": events}) + b"\n\n"
+    finally:
+        board_hub.unsubscribe(project_id, subscriber)
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+
+
+class LRUCache:
+    """
+    Small in-process LRU map. Not shared between workers, so anything cached here
+    must either be safe to serve per process or be validated by the caller.
+
+    With a `weigher`, `maxsize` bounds the summed weight of the values rather than
+    their count, so a few large entries can't crowd memory like many small ones.
+    """
+
+    def __init__(self, maxsize: int = 1024, weigher: Optional[Callable[[Any], int]] = None):
+        self.maxsize = maxsize
+        self.weigher = weigher
+        self.weight = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def _weigh(self, value: Any) -> int:
+        return self.weigher(value) if self.weigher is not None else 1
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return default
+        return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if key in self._data:
+            self.weight -= self._weigh(self._data[key])
+        self._data[key] = value
+        self._data.move_to_end(key)
+        self.weight += self._weigh(value)
+        # The newest entry is always kept, even if it alone is over the limit
+        while self.weight > self.maxsize and len(self._data) > 1:
+            _, evicted = self._data.popitem(last=False)
+            self.weight -= self._weigh(evicted)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        if key not in self._data:
+            return default
+        value = self._data.pop(key)
+        self.weight -= self._weigh(value)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.weight = 0
+
+    def keys(self) -> List[Hashable]:
+        return list(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,304 @@
+import heapq
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select, update, func, text, bindparam, Integer, Date, Boolean
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import LRUCache
+from core.dag import IncrementalDAG, CycleError
+from models.scenario import Scenario
+from models.task import Task
+from models.task_dependency import TaskDependency
+
+# scenario_id -> (plan version, CriticalPath). A hit is only used if the scenario's
+# plan_version still matches, so writes from other workers are never missed.
+schedule_cache = LRUCache(maxsize=1_000)
+
+
+class CriticalPath:
+    """
+    Critical path method over a scenario's tasks. Times are whole days from the
+    scenario start: a task runs from `es` (earliest start) to `ef` (earliest finish);
+    `ls`/`lf` are the latest start/finish that keep the scenario's end date, and
+    tasks without slack are critical.
+
+    A full pass is O(V + E). After a duration or dependency change only the tasks
+    downstream of it (forward pass) and the tasks whose latest times actually move
+    (backward pass) are revisited; the backward pass is global only when the
+    scenario's end moves.
+    """
+
+    def __init__(self, start: date, durations: Dict[int, int], predecessors: Dict[int, Iterable[int]]):
+        self.start = start
+        self.duration: Dict[int, int] = {}
+        self.graph = IncrementalDAG()
+        for task_id, days in durations.items():
+            self.duration[task_id] = max(days or 0, 0)
+            self.graph.add_node(task_id)
+        for task_id, depends_on in predecessors.items():
+            # Edges to tasks of other scenarios don't constrain this schedule
+            self.graph.add_edges((dep, task_id) for dep in depends_on if dep in self.duration)
+
+        self.es: Dict[int, int] = {}
+        self.ef: Dict[int, int] = {}
+        self.ls: Dict[int, int] = {}
+        self.lf: Dict[int, int] = {}
+        self.finish = 0
+        # task_id -> (start date, end date, critical) as last written to the database
+        self.saved: Dict[int, Tuple[Optional[date], Optional[date], bool]] = {}
+        self._forward(self.duration)
+        self._backward(self.duration)
+
+    @property
+    def slack(self) -> Dict[int, int]:
+        return {task_id: self.ls[task_id] - self.es[task_id] for task_id in self.duration}
+
+    def is_critical(self, task_id: int) -> bool:
+        return self.ls[task_id] == self.es[task_id]
+
+    def critical_path(self) -> List[int]:
+        return [task_id for task_id in self.graph.topological_order() if self.is_critical(task_id)]
+
+    def dates(self, task_id: int) -> Tuple[date, date, bool]:
+        return (
+            self.start + timedelta(days=self.es[task_id]),
+            self.start + timedelta(days=self.ef[task_id]),
+            self.is_critical(task_id),
+        )
+
+    def set_duration(self, task_id: int, days: Optional[int]) -> Set[int]:
+        """Changes a task's duration; returns the tasks whose schedule changed."""
+        self.duration[task_id] = max(days or 0, 0)
+        return self._propagate({task_id}, {task_id})
+
+    def set_predecessors(self, task_id: int, depends_on: Iterable[int]) -> Set[int]:
+        """
+        Replaces a task's predecessors; returns the tasks whose schedule changed.
+        Raises CycleError (schedule untouched) if the new edges would close a cycle.
+        """
+        wanted = {dep for dep in depends_on if dep in self.duration}
+        current = set(self.graph.pred[task_id])
+        removed, added = current - wanted, wanted - current
+        for dep in removed:
+            self.graph.remove_edge(dep, task_id)
+        try:
+            self.graph.add_edges((dep, task_id) for dep in added)
+        except CycleError:
+            for dep in removed:
+                self.graph.add_edge(dep, task_id)
+            raise
+        # Predecessors gained or lost a successor, which moves their latest times
+        return self._propagate({task_id}, {task_id} | removed | added)
+
+    def add_dependencies(self, durations: Dict[int, Optional[int]], edges: Iterable[Tuple[int, int]]) -> Set[int]:
+        """
+        Adds tasks (any not yet known) and (depends_on, task) edges in one pass over the
+        maintained topological order, so edges that agree with it cost O(1) each.
+        Raises CycleError with the offending path, leaving the schedule untouched.
+        Returns the tasks whose schedule changed.
+        """
+        new_tasks = [task_id for task_id in durations if task_id not in self.duration]
+        for task_id in new_tasks:
+            self.duration[task_id] = max(durations[task_id] or 0, 0)
+            self.graph.add_node(task_id)
+        edges = [(dep, task_id) for dep, task_id in edges if not self.graph.has_edge(dep, task_id)]
+        try:
+            self.graph.add_edges(edges)
+        except CycleError:
+            for task_id in new_tasks:
+                self.graph.remove_node(task_id)
+                del self.duration[task_id]
+            raise
+        # New tasks start unscheduled: the backward pass has to visit them even if nothing else moves
+        touched = set(new_tasks) | {task_id for _, task_id in edges}
+        return self._propagate(touched, touched | {dep for dep, _ in edges}) | set(new_tasks)
+
+    def _propagate(self, forward_seeds: Set[int], backward_seeds: Set[int]) -> Set[int]:
+        finish = self.finish
+        changed = self._forward(forward_seeds)
+        if self.finish != finish:
+            changed |= self._backward(self.duration)
+        else:
+            changed |= self._backward(backward_seeds)
+        return changed
+
+    def _forward(self, seeds: Iterable[int]) -> Set[int]:
+        """Recomputes es/ef from the seeds downstream, in topological order, stopping where nothing moves."""
+        order = self.graph.ord
+        heap = [(order[task_id], task_id) for task_id in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        changed = set()
+        while heap:
+            _, task_id = heapq.heappop(heap)
+            es = max((self.ef[dep] for dep in self.graph.pred[task_id]), default=0)
+            ef = es + self.duration[task_id]
+            if self.es.get(task_id) == es and self.ef.get(task_id) == ef:
+                continue
+            self.es[task_id], self.ef[task_id] = es, ef
+            changed.add(task_id)
+            for nxt in self.graph.succ[task_id]:
+                if nxt not in queued:
+                    queued.add(nxt)
+                    heapq.heappush(heap, (order[nxt], nxt))
+        self.finish = max(self.ef.values(), default=0)
+        return changed
+
+    def _backward(self, seeds: Iterable[int]) -> Set[int]:
+        """Recomputes ls/lf from the seeds upstream, in reverse topological order."""
+        order = self.graph.ord
+        heap = [(-order[task_id], task_id) for task_id in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        changed = set()
+        while heap:
+            _, task_id = heapq.heappop(heap)
+            lf = min((self.ls[nxt] for nxt in self.graph.succ[task_id]), default=self.finish)
+            ls = lf - self.duration[task_id]
+            if self.lf.get(task_id) == lf and self.ls.get(task_id) == ls:
+                continue
+            self.lf[task_id], self.ls[task_id] = lf, ls
+            changed.add(task_id)
+            for dep in self.graph.pred[task_id]:
+                if dep not in queued:
+                    queued.add(dep)
+                    heapq.heappush(heap, (-order[dep], dep))
+        return changed
+
+
+async def bump_plan_version(db: AsyncSession, scenario_id: int) -> Tuple[int, date]:
+    """
+    Marks the scenario's task graph as changed and returns (new plan version, start date).
+    The row lock it takes serializes plan writes per scenario until the transaction ends.
+    """
+    result = await db.execute(
+        update(Scenario)
+        .where(Scenario.scenario_id == scenario_id)
+        .values(plan_version=Scenario.plan_version + 1)
+        .returning(Scenario.plan_version, Scenario.estimated_start_date)
+    )
+    version, start = result.one()
+    return version, start or datetime.utcnow().date()
+
+
+async def lock_plan(db: AsyncSession, scenario_id: int) -> Optional[Tuple[int, date]]:
+    """Like `bump_plan_version` for readers that write schedules but not the graph; None if no such scenario."""
+    result = await db.execute(
+        select(Scenario.plan_version, Scenario.estimated_start_date)
+        .where(Scenario.scenario_id == scenario_id)
+        .with_for_update()
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return row.plan_version, row.estimated_start_date or datetime.utcnow().date()
+
+
+async def load_critical_path(db: AsyncSession, scenario_id: int, start: date) -> CriticalPath:
+    """Builds the schedule from one query: every task of the scenario with its predecessor ids."""
+    depends_on = func.array_agg(TaskDependency.depends_on_task_id).filter(TaskDependency.depends_on_task_id.isnot(None))
+    result = await db.execute(
+        select(
+            Task.id,
+            Task.duration_days,
+            Task.estimated_start_date,
+            Task.estimated_end_date,
+            Task.critical_path_flag,
+            depends_on.label("depends_on"),
+        )
+        .outerjoin(TaskDependency, TaskDependency.task_id == Task.id)
+        .where(Task.scenario_id == scenario_id)
+        .group_by(Task.id)
+    )
+    rows = result.all()
+    schedule = CriticalPath(
+        start,
+        {row.id: row.duration_days for row in rows},
+        {row.id: row.depends_on or [] for row in rows},
+    )
+    schedule.saved = {
+        row.id: (row.estimated_start_date, row.estimated_end_date, row.critical_path_flag) for row in rows
+    }
+    return schedule
+
+
+async def get_critical_path(db: AsyncSession, scenario_id: int, version: int, start: date) -> Tuple[CriticalPath, bool]:
+    """
+    Returns (schedule, cached): the cached schedule if it was built for `version`, else a
+    fresh one. A fresh schedule may differ from the stored dates anywhere, so save all of it.
+    The cached copy is taken out of the cache: callers mutate it and put it back with
+    `remember_critical_path` only once their transaction has committed.
+    """
+    cached = schedule_cache.pop(scenario_id)
+    if cached is not None and cached[0] == version and cached[1].start == start:
+        return cached[1], True
+    return await load_critical_path(db, scenario_id, start), False
+
+
+def peek_critical_path(scenario_id: int, version: int) -> Optional[CriticalPath]:
+    """The cached schedule if it was built for `version`, left in the cache; for read-only use."""
+    cached = schedule_cache.get(scenario_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    return None
+
+
+def remember_critical_path(scenario_id: int, version: int, schedule: CriticalPath) -> None:
+    schedule_cache.set(scenario_id, (version, schedule))
+
+
+def carry_critical_path(scenario_id: int, version: int) -> None:
+    """After a committed write that bumped the plan version without changing the schedule, keeps the cached one valid."""
+    cached = schedule_cache.get(scenario_id)
+    if cached is not None and cached[0] == version - 1:
+        schedule_cache.set(scenario_id, (version, cached[1]))
+
+
+async def save_critical_path(
+    db: AsyncSession,
+    scenario_id: int,
+    schedule: CriticalPath,
+    task_ids: Optional[Iterable[int]] = None
+) -> int:
+    """
+    Writes dates and critical flags of `task_ids` (default: all tasks) in one UPDATE,
+    skipping rows whose stored values are already right. Does not commit.
+    Returns the number of rows written.
+    """
+    rows = []
+    for task_id in schedule.duration if task_ids is None else task_ids:
+        if task_id not in schedule.duration:
+            continue
+        values = schedule.dates(task_id)
+        if schedule.saved.get(task_id) != values:
+            rows.append((task_id, *values))
+
+    if rows:
+        ids, starts, ends, flags = (list(column) for column in zip(*rows))
+        await db.execute(
+            text("""
+                UPDATE tasks
+                SET estimated_start_date = v.start_date,
+                    estimated_end_date = v.end_date,
+                    critical_path_flag = v.critical
+                FROM unnest(:ids, :starts, :ends, :flags) AS v(id, start_date, end_date, critical)
+                WHERE tasks.id = v.id
+            """).bindparams(
+                bindparam("ids", type_=ARRAY(Integer)),
+                bindparam("starts", type_=ARRAY(Date)),
+                bindparam("ends", type_=ARRAY(Date)),
+                bindparam("flags", type_=ARRAY(Boolean)),
+            ),
+            {"ids": ids, "starts": starts, "ends": ends, "flags": flags}
+        )
+        for task_id, *values in rows:
+            schedule.saved[task_id] = tuple(values)
+
+    await db.execute(
+        update(Scenario)
+        .where(Scenario.scenario_id == scenario_id)
+        .where(Scenario.estimated_end_date.is_distinct_from(schedule.start + timedelta(days=schedule.finish)))
+        .values(estimated_end_date=schedule.start + timedelta(days=schedule.finish))
+    )
+    return len(rows)
@@ -0,0 +1,111 @@
+import logging
+import re
+from typing import Any, Dict, Mapping
+import orjson
+import xxhash
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import LRUCache
+from core.notifications import ChannelListener
+from core.property_registry import (
+    PROPERTIES_REGISTRY, PropertyType, TenantSchema, freeze_properties, get_frozen_schema,
+    get_property_keys, get_registry_version
+)
+from models.custom_property import CustomProperty
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel carrying "<user_id>:<entity_type>" whenever custom properties change
+SCHEMA_CHANNEL = "property_schema_changed"
+
+# (user_id, entity_type) -> TenantSchema. Kept fresh by the listener below, so a hit costs no query.
+tenant_schemas = LRUCache(maxsize=10_000)
+
+CUSTOM_KEY_PATTERN = re.compile(r"^[a-z][a-z0-9_]{0,49}$")
+OPTION_TYPES = (PropertyType.SELECT, PropertyType.MULTI_SELECT, PropertyType.STATUS)
+
+
+def custom_property_definition(entity_type: str, key: str, definition: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Validates a custom property and returns its stored definition. Raises ValueError.
+    Custom properties are never required: existing rows don't have them.
+    """
+    if entity_type not in PROPERTIES_REGISTRY:
+        raise ValueError(f"Unknown entity type '{entity_type}'")
+    if not CUSTOM_KEY_PATTERN.match(key):
+        raise ValueError("Property keys must be lowercase letters, digits and underscores, starting with a letter")
+    if key in get_property_keys(entity_type):
+        raise ValueError(f"'{key}' is a built-in {entity_type} property")
+
+    try:
+        prop_type = PropertyType(definition.get("type"))
+    except ValueError:
+        raise ValueError(f"Invalid property type {definition.get('type')!r}")
+
+    stored: Dict[str, Any] = {"type": prop_type.value, "label": str(definition.get("label") or key)}
+    if prop_type in OPTION_TYPES:
+        options = definition.get("options") or []
+        if not isinstance(options, list) or not all(isinstance(option, str) for option in options):
+            raise ValueError("options must be a list of strings")
+        stored["options"] = options
+    if definition.get("default") is not None:
+        stored["default"] = definition["default"]
+    if "visible" in definition:
+        stored["visible"] = bool(definition["visible"])
+    return stored
+
+
+async def load_tenant_schema(db: AsyncSession, user_id: int, entity_type: str) -> TenantSchema:
+    """
+    Returns the user's schema for an entity type: registry properties plus their custom ones.
+    Served from memory until a change notification (or a registry change) invalidates it.
+    """
+    cache_key = (user_id, entity_type)
+    cached = tenant_schemas.get(cache_key)
+    registry_version = get_registry_version()
+    if cached is not None and cached.registry_version == registry_version:
+        return cached
+
+    result = await db.execute(
+        select(CustomProperty.key, CustomProperty.definition)
+        .where(CustomProperty.user_id == user_id, CustomProperty.entity_type == entity_type)
+        .order_by(CustomProperty.id)
+    )
+    builtin = set(get_property_keys(entity_type))
+    # A key the registry adopted later wins over the custom one
+    custom = [{**definition, "key": key} for key, definition in result if key not in builtin]
+
+    fingerprint = ""
+    if custom:
+        # 128 bits: tenants with equal fingerprints share validators, so collisions must not happen in practice
+        fingerprint = xxhash.xxh3_128_hexdigest(orjson.dumps(custom, option=orjson.OPT_SORT_KEYS))
+    schema = TenantSchema(
+        entity_type=entity_type,
+        properties=get_frozen_schema(entity_type) + freeze_properties(custom),
+        fingerprint=fingerprint,
+        registry_version=registry_version,
+    )
+    tenant_schemas.set(cache_key, schema)
+    return schema
+
+
+async def publish_schema_change(db: AsyncSession, user_id: int, entity_type: str) -> None:
+    """Queues a change notification; Postgres delivers it to every worker when the transaction commits."""
+    await db.execute(select(func.pg_notify(SCHEMA_CHANNEL, f"{user_id}:{entity_type}")))
+
+
+def forget_tenant_schema(user_id: int, entity_type: str) -> None:
+    tenant_schemas.pop((user_id, entity_type))
+
+
+def _on_schema_change(connection, pid, channel, payload) -> None:
+    user_id, _, entity_type = payload.partition(":")
+    try:
+        forget_tenant_schema(int(user_id), entity_type)
+    except ValueError:
+        logger.warning(f"Ignoring malformed {SCHEMA_CHANNEL} payload: {payload!r}")
+
+
+# Drops the whole cache whenever the listening connection is (re)established or lost
+schema_listener = ChannelListener(SCHEMA_CHANNEL, _on_schema_change, tenant_schemas.clear)
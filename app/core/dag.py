@@ -0,0 +1,188 @@
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+class CycleError(Exception):
+    """Raised when an edge would close a cycle. `path` starts and ends on the same node."""
+
+    def __init__(self, path: List[Hashable]):
+        self.path = path
+        super().__init__(" -> ".join(str(node) for node in path))
+
+
+class IncrementalDAG:
+    """
+    Directed acyclic graph that keeps a topological order up to date as edges are added
+    (Pearce & Kelly's dynamic topological sort). An edge u -> v means u comes before v.
+
+    Inserting an edge that already agrees with the order is O(1). Otherwise only the nodes
+    ranked between v and u are visited, instead of running a full DFS over the graph.
+    Transitive ancestor/descendant sets are memoized until the next mutation.
+    """
+
+    def __init__(self):
+        self.succ: Dict[Hashable, Set[Hashable]] = {}
+        self.pred: Dict[Hashable, Set[Hashable]] = {}
+        self.ord: Dict[Hashable, int] = {}
+        self._next_ord = 0
+        self._closure: Dict[Tuple[str, Hashable], FrozenSet[Hashable]] = {}
+
+    def __contains__(self, node: Hashable) -> bool:
+        return node in self.ord
+
+    def __len__(self) -> int:
+        return len(self.ord)
+
+    @property
+    def edges(self) -> List[Tuple[Hashable, Hashable]]:
+        return [(u, v) for u, targets in self.succ.items() for v in targets]
+
+    def add_node(self, node: Hashable) -> None:
+        if node in self.ord:
+            return
+        self.ord[node] = self._next_ord
+        self._next_ord += 1
+        self.succ[node] = set()
+        self.pred[node] = set()
+
+    def remove_node(self, node: Hashable) -> None:
+        # Removing nodes or edges never invalidates the order
+        if node not in self.ord:
+            return
+        for v in self.succ.pop(node):
+            self.pred[v].discard(node)
+        for u in self.pred.pop(node):
+            self.succ[u].discard(node)
+        del self.ord[node]
+        self._closure.clear()
+
+    def has_edge(self, u: Hashable, v: Hashable) -> bool:
+        return v in self.succ.get(u, ())
+
+    def add_edge(self, u: Hashable, v: Hashable) -> None:
+        """Adds u -> v, raising CycleError (and leaving the graph unchanged) if v already reaches u."""
+        if u == v:
+            raise CycleError([u, u])
+        self.add_node(u)
+        self.add_node(v)
+        if v in self.succ[u]:
+            return
+
+        lower, upper = self.ord[v], self.ord[u]
+        if lower < upper:
+            # v is ranked before u: find what must move, or the cycle if v reaches u
+            forward = self._forward_region(v, u, upper)
+            backward = self._backward_region(u, lower)
+            self._reorder(backward, forward)
+
+        self.succ[u].add(v)
+        self.pred[v].add(u)
+        self._closure.clear()
+
+    def add_edges(self, edges: Iterable[Tuple[Hashable, Hashable]]) -> None:
+        """Adds several edges atomically: on a cycle none of them are kept."""
+        added = []
+        try:
+            for u, v in edges:
+                if self.has_edge(u, v):
+                    continue
+                self.add_edge(u, v)
+                added.append((u, v))
+        except CycleError:
+            for u, v in added:
+                self.remove_edge(u, v)
+            raise
+
+    def remove_edge(self, u: Hashable, v: Hashable) -> None:
+        if v in self.succ.get(u, ()):
+            self.succ[u].discard(v)
+            self.pred[v].discard(u)
+            self._closure.clear()
+
+    def topological_order(self) -> List[Hashable]:
+        return sorted(self.ord, key=self.ord.__getitem__)
+
+    def descendants(self, node: Hashable) -> FrozenSet[Hashable]:
+        return self._reachable(node, self.succ, "down")
+
+    def ancestors(self, node: Hashable) -> FrozenSet[Hashable]:
+        return self._reachable(node, self.pred, "up")
+
+    def distances(self, node: Hashable, upstream: bool, max_depth: Optional[int] = None) -> Dict[Hashable, int]:
+        """
+        Ancestors (upstream) or descendants of `node` with their distance in edges along the
+        shortest path, stopping after `max_depth` levels. Breadth-first, O(visited edges).
+        """
+        adjacency = self.pred if upstream else self.succ
+        depth: Dict[Hashable, int] = {node: 0}
+        frontier = [node]
+        level = 0
+        while frontier and (max_depth is None or level < max_depth):
+            level += 1
+            following = []
+            for current in frontier:
+                for nxt in adjacency.get(current, ()):
+                    if nxt not in depth:
+                        depth[nxt] = level
+                        following.append(nxt)
+            frontier = following
+        del depth[node]
+        return depth
+
+    def _reachable(self, node: Hashable, adjacency: Dict[Hashable, Set[Hashable]], direction: str) -> FrozenSet[Hashable]:
+        key = (direction, node)
+        cached = self._closure.get(key)
+        if cached is not None:
+            return cached
+
+        seen: Set[Hashable] = set()
+        stack = list(adjacency.get(node, ()))
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            stack.extend(adjacency[current])
+
+        result = frozenset(seen)
+        self._closure[key] = result
+        return result
+
+    def _forward_region(self, start: Hashable, target: Hashable, upper: int) -> List[Hashable]:
+        """Nodes reachable from start ranked no later than `upper`; raises CycleError on reaching target."""
+        parent = {start: None}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for nxt in self.succ[node]:
+                if nxt == target:
+                    path = [nxt]
+                    while node is not None:
+                        path.append(node)
+                        node = parent[node]
+                    # target -> start -> ... -> target
+                    raise CycleError([target] + path[::-1])
+                if nxt not in parent and self.ord[nxt] < upper:
+                    parent[nxt] = node
+                    stack.append(nxt)
+        return list(parent)
+
+    def _backward_region(self, start: Hashable, lower: int) -> List[Hashable]:
+        """Nodes reaching start ranked no earlier than `lower`."""
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for prev in self.pred[node]:
+                if prev not in seen and self.ord[prev] > lower:
+                    seen.add(prev)
+                    stack.append(prev)
+        return list(seen)
+
+    def _reorder(self, backward: List[Hashable], forward: List[Hashable]) -> None:
+        # Reuse the same slots: everything that reaches u goes before everything v reaches
+        backward.sort(key=self.ord.__getitem__)
+        forward.sort(key=self.ord.__getitem__)
+        nodes = backward + forward
+        slots = sorted(self.ord[node] for node in nodes)
+        for node, slot in zip(nodes, slots):
+            self.ord[node] = slot
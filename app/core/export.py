@@ -0,0 +1,83 @@
+import csv
+import io
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional
+import orjson
+import zstandard
+
+from core.property_registry import PropertyType, TenantSchema, schema_properties
+
+# Rows are buffered into chunks of roughly this size before being sent
+CHUNK_SIZE = 64 * 1024
+
+
+def flatten_properties(
+    entity_type: str,
+    properties: Mapping[str, Any],
+    schema: Optional[TenantSchema] = None
+) -> Dict[str, Any]:
+    """One value per schema key, in schema order; unknown keys are dropped."""
+    properties = properties or {}
+    return {prop["key"]: properties.get(prop["key"]) for prop in schema_properties(entity_type, schema)}
+
+
+def csv_cell(prop_type: PropertyType, value: Any) -> Any:
+    if value is None:
+        return ""
+    if prop_type == PropertyType.MULTI_SELECT and isinstance(value, list):
+        return "; ".join(str(item) for item in value)
+    if prop_type == PropertyType.JSON or isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    return value
+
+
+async def encode_ndjson(
+    entity_type: str,
+    rows: AsyncIterator[Mapping[str, Any]],
+    base_columns: List[str],
+    schema: Optional[TenantSchema] = None
+) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    async for row in rows:
+        record = {column: row[column] for column in base_columns}
+        record.update(flatten_properties(entity_type, row["properties"], schema))
+        buffer += orjson.dumps(record)
+        buffer += b"\n"
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def encode_csv(
+    entity_type: str,
+    rows: AsyncIterator[Mapping[str, Any]],
+    base_columns: List[str],
+    schema: Optional[TenantSchema] = None
+) -> AsyncIterator[bytes]:
+    properties_schema = schema_properties(entity_type, schema)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(base_columns + [prop["key"] for prop in properties_schema])
+
+    async for row in rows:
+        properties = row["properties"] or {}
+        writer.writerow(
+            [row[column] for column in base_columns]
+            + [csv_cell(prop["type"], properties.get(prop["key"])) for prop in properties_schema]
+        )
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def zstd_compress(chunks: AsyncIterator[bytes], level: int = 3) -> AsyncIterator[bytes]:
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
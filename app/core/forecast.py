@@ -0,0 +1,207 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.scenario import Scenario, Milestone
+from models.task import Task
+from models.task_dependency import TaskDependency
+
+PERCENTILES = (50, 80, 95)
+DEFAULT_SAMPLES = 2_000
+MAX_SAMPLES = 20_000
+# Upper bound on samples x tasks: each float32 (samples, tasks) array is 4 bytes per cell,
+# and a run holds a few of them at once
+MAX_SIMULATED_CELLS = 10_000_000
+
+
+@dataclass
+class ForecastPlan:
+    """
+    A scenario's task DAG with a (low, mode, high) duration estimate per task, laid out
+    for vectorized passes: tasks are grouped into levels (longest path from a source),
+    so every predecessor of a level's tasks sits in an earlier level.
+    """
+    task_ids: List[int]
+    low: np.ndarray
+    mode: np.ndarray
+    high: np.ndarray
+    # Per level: (task columns, columns of tasks without predecessors,
+    #             columns with predecessors, their predecessor columns concatenated, reduceat offsets)
+    levels: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]
+    # milestone_id -> task columns
+    milestones: Dict[int, np.ndarray]
+
+
+def build_forecast_plan(
+    durations: Dict[int, Tuple[float, float, float]],
+    predecessors: Dict[int, Sequence[int]],
+    milestone_of: Dict[int, Optional[int]]
+) -> ForecastPlan:
+    """Raises ValueError if the dependencies contain a cycle."""
+    task_ids = list(durations)
+    column = {task_id: index for index, task_id in enumerate(task_ids)}
+    preds = [[column[dep] for dep in predecessors.get(task_id, ()) if dep in column] for task_id in task_ids]
+
+    # Kahn's algorithm, recording each task's level
+    succ: List[List[int]] = [[] for _ in task_ids]
+    indegree = [len(p) for p in preds]
+    for index, p in enumerate(preds):
+        for dep in p:
+            succ[dep].append(index)
+    level = [0] * len(task_ids)
+    frontier = [index for index, degree in enumerate(indegree) if degree == 0]
+    seen = 0
+    while frontier:
+        seen += len(frontier)
+        following = []
+        for index in frontier:
+            for nxt in succ[index]:
+                level[nxt] = max(level[nxt], level[index] + 1)
+                indegree[nxt] -= 1
+                if indegree[nxt] == 0:
+                    following.append(nxt)
+        frontier = following
+    if seen != len(task_ids):
+        raise ValueError("Task dependencies form a cycle")
+
+    by_level: Dict[int, List[int]] = {}
+    for index, depth in enumerate(level):
+        by_level.setdefault(depth, []).append(index)
+    levels = []
+    for depth in sorted(by_level):
+        columns = by_level[depth]
+        sources = [index for index in columns if not preds[index]]
+        dependents = [index for index in columns if preds[index]]
+        gathered = [dep for index in dependents for dep in preds[index]]
+        offsets = np.cumsum([0] + [len(preds[index]) for index in dependents[:-1]])
+        levels.append((
+            np.array(columns, dtype=np.intp),
+            np.array(sources, dtype=np.intp),
+            np.array(dependents, dtype=np.intp),
+            np.array(gathered, dtype=np.intp),
+            offsets.astype(np.intp),
+        ))
+
+    estimates = np.array([durations[task_id] for task_id in task_ids], dtype=np.float32).reshape(-1, 3)
+    estimates.sort(axis=1)
+    milestones: Dict[int, List[int]] = {}
+    for task_id, milestone_id in milestone_of.items():
+        if milestone_id is not None and task_id in column:
+            milestones.setdefault(milestone_id, []).append(column[task_id])
+
+    return ForecastPlan(
+        task_ids=task_ids,
+        low=estimates[:, 0],
+        mode=estimates[:, 1],
+        high=estimates[:, 2],
+        levels=levels,
+        milestones={key: np.array(value, dtype=np.intp) for key, value in milestones.items()},
+    )
+
+
+def sample_durations(plan: ForecastPlan, samples: int, rng: np.random.Generator) -> np.ndarray:
+    """(samples, tasks) draws from each task's triangular(low, mode, high), by inverse CDF."""
+    low, mode, high = plan.low, plan.mode, plan.high
+    span = high - low
+    u = rng.random((samples, len(plan.task_ids)), dtype=np.float32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cut = np.where(span > 0, (mode - low) / span, 0.0)
+        left = low + np.sqrt(u * span * (mode - low))
+        right = high - np.sqrt((1 - u) * span * (high - mode))
+    return np.where(u < cut, left, right).astype(np.float32)
+
+
+def simulate_finish(plan: ForecastPlan, durations: np.ndarray) -> np.ndarray:
+    """
+    Earliest finish of every task in every sample, (samples, tasks). One vectorized step per
+    level: start = max of the predecessors' finishes (np.maximum.reduceat over the gathered
+    columns), finish = start + duration. All samples advance together.
+    """
+    finish = np.zeros_like(durations)
+    for columns, sources, dependents, gathered, offsets in plan.levels:
+        if len(sources):
+            finish[:, sources] = durations[:, sources]
+        if len(dependents):
+            start = np.maximum.reduceat(finish[:, gathered], offsets, axis=1)
+            finish[:, dependents] = start + durations[:, dependents]
+    return finish
+
+
+def forecast_finish_days(
+    plan: ForecastPlan,
+    samples: int,
+    seed: Optional[int] = None
+) -> Tuple[np.ndarray, Dict[int, np.ndarray]]:
+    """
+    Finish day of the whole plan and of each milestone, one entry per sample. CPU-bound:
+    run it off the event loop.
+    """
+    finish = simulate_finish(plan, sample_durations(plan, samples, np.random.default_rng(seed)))
+    overall = finish.max(axis=1) if plan.task_ids else np.zeros(samples, dtype=np.float32)
+    return overall, {milestone_id: finish[:, columns].max(axis=1) for milestone_id, columns in plan.milestones.items()}
+
+
+def percentile_dates(start: date, days: np.ndarray) -> Dict[str, date]:
+    values = np.percentile(days, PERCENTILES)
+    return {f"p{p}": start + timedelta(days=int(np.ceil(value))) for p, value in zip(PERCENTILES, values)}
+
+
+async def load_forecast_plan(db: AsyncSession, scenario: Scenario) -> ForecastPlan:
+    """
+    Takes the scenario's tasks and dependencies as the plan, and matches each task by title
+    to the same task in the project's optimistic and pessimistic scenarios for its low/high
+    duration. A side without a counterpart falls back to the scenario's own duration.
+    """
+    depends_on = func.array_agg(TaskDependency.depends_on_task_id).filter(TaskDependency.depends_on_task_id.isnot(None))
+    result = await db.execute(
+        select(Task.id, Task.title, Task.duration_days, Task.milestone_id, depends_on.label("depends_on"))
+        .outerjoin(TaskDependency, TaskDependency.task_id == Task.id)
+        .where(Task.scenario_id == scenario.scenario_id)
+        .group_by(Task.id)
+    )
+    rows = result.all()
+
+    # Latest optimistic/pessimistic variant of the same project, excluding this scenario
+    variants = (
+        select(Scenario.scenario_type, func.max(Scenario.scenario_id).label("scenario_id"))
+        .where(Scenario.project_id == scenario.project_id)
+        .where(Scenario.scenario_id != scenario.scenario_id)
+        .where(func.lower(Scenario.scenario_type).in_(("optimistic", "pessimistic")))
+        .group_by(Scenario.scenario_type)
+        .subquery()
+    )
+    result = await db.execute(
+        select(func.lower(variants.c.scenario_type), func.lower(Task.title), func.max(Task.duration_days))
+        .join(Task, Task.scenario_id == variants.c.scenario_id)
+        .group_by(variants.c.scenario_type, func.lower(Task.title))
+    )
+    counterpart: Dict[Tuple[str, str], int] = {
+        (scenario_type, title): days for scenario_type, title, days in result if days is not None
+    }
+
+    durations = {}
+    for row in rows:
+        mode = row.duration_days or 0
+        title = (row.title or "").lower()
+        durations[row.id] = (
+            counterpart.get(("optimistic", title), mode),
+            mode,
+            counterpart.get(("pessimistic", title), mode),
+        )
+    return build_forecast_plan(
+        durations,
+        {row.id: row.depends_on or [] for row in rows},
+        {row.id: row.milestone_id for row in rows},
+    )
+
+
+async def milestone_titles(db: AsyncSession, scenario_id: int) -> List[Tuple[int, str]]:
+    result = await db.execute(
+        select(Milestone.milestone_id, Milestone.title)
+        .where(Milestone.scenario_id == scenario_id)
+        .order_by(Milestone.rank, Milestone.milestone_id)
+    )
+    return result.all()
@@ -0,0 +1,29 @@
+from typing import Any, Optional
+import xxhash
+from fastapi import Response, status
+
+
+def compute_etag(*parts: Any) -> str:
+    """Builds a strong ETag from the given parts (ids, timestamps, counts...)."""
+    digest = xxhash.xxh64(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Checks an If-None-Match header value (which may list several tags, or be *) against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Clients may echo the tag back as weak (W/"..."); compare the opaque part only
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def etag_headers(etag: str) -> dict[str, str]:
+    # no-cache: clients may store the body but must revalidate before reusing it
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
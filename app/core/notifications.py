@@ -0,0 +1,51 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Sequence
+import asyncpg
+from sqlalchemy.engine import URL
+
+logger = logging.getLogger(__name__)
+
+# Seconds between liveness checks of the listening connection
+LISTENER_PING_INTERVAL = 30
+LISTENER_RETRY_DELAY = 5
+
+
+@dataclass(frozen=True)
+class ChannelListener:
+    channel: str
+    # asyncpg listener callback: (connection, pid, channel, payload)
+    on_notify: Callable[[Any, int, str, str], None]
+    # Called whenever the connection is (re)established or lost, since notifications
+    # sent while nobody was listening are gone
+    on_resync: Callable[[], None]
+
+
+async def listen_for_notifications(url: URL, listeners: Sequence[ChannelListener]) -> None:
+    """
+    Holds one dedicated connection, outside the engine's pool, LISTENing on the channel of
+    every listener for the lifetime of the app. Reconnects after failures.
+    """
+    dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+    while True:
+        connection = None
+        try:
+            connection = await asyncpg.connect(dsn)
+            for listener in listeners:
+                await connection.add_listener(listener.channel, listener.on_notify)
+            for listener in listeners:
+                listener.on_resync()
+            while True:
+                await asyncio.sleep(LISTENER_PING_INTERVAL)
+                await connection.fetchval("SELECT 1")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Notification listener failed: {e}")
+        finally:
+            if connection is not None and not connection.is_closed():
+                connection.terminate()
+        for listener in listeners:
+            listener.on_resync()
+        await asyncio.sleep(LISTENER_RETRY_DELAY)
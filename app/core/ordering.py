@@ -0,0 +1,184 @@
+from typing import List, Optional
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.board_events import publish_board_events, scenario_event
+from core.critical_path import bump_plan_version, carry_critical_path
+from core.database import AsyncSessionLocal
+
+# Fractional order keys: any two keys have room for a third between them, so moving an
+# item rewrites only that item's key. A key is an "integer" part (a head letter giving
+# its length, then base-62 digits) and an optional fraction that never ends in "0".
+# Keys compare as plain strings, hence the "C" collation on the rank columns.
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+FIRST_RANK = "a0"
+# Repeated inserts at the same spot grow keys by about one character per six inserts;
+# past this length the scope's keys are rewritten evenly in the background
+MAX_RANK_LENGTH = 32
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid order key head: {head!r}")
+
+
+def _split(key: str) -> tuple[str, str]:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Invalid order key: {key!r}")
+    fraction = key[length:]
+    if key == SMALLEST_INTEGER or fraction.endswith(DIGITS[0]):
+        raise ValueError(f"Invalid order key: {key!r}")
+    return key[:length], fraction
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """A fraction strictly between fractions a and b (b None meaning 1)."""
+    if b is not None:
+        n = 0
+        while (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _increment(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for index in reversed(range(len(digits))):
+        value = DIGITS.index(digits[index]) + 1
+        if value < len(DIGITS):
+            digits[index] = DIGITS[value]
+            return head + "".join(digits)
+        digits[index] = DIGITS[0]
+    if head == "Z":
+        return "a" + DIGITS[0]
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for index in reversed(range(len(digits))):
+        value = DIGITS.index(digits[index]) - 1
+        if value >= 0:
+            digits[index] = DIGITS[value]
+            return head + "".join(digits)
+        digits[index] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """
+    An order key strictly between a and b; None stands for the start or end of the list.
+    Appending or prepending increments the integer part, so keys of a list built one
+    item at a time grow logarithmically. Raises ValueError unless a < b.
+    """
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"Order keys out of order: {a!r} >= {b!r}")
+    if a is None:
+        if b is None:
+            return FIRST_RANK
+        integer, fraction = _split(b)
+        if integer == SMALLEST_INTEGER:
+            return integer + _midpoint("", fraction)
+        if integer < b:
+            return integer
+        lower = _decrement(integer)
+        if lower is None:
+            raise ValueError("Cannot decrement any further")
+        return lower
+    integer, fraction = _split(a)
+    if b is None:
+        higher = _increment(integer)
+        return integer + _midpoint(fraction, None) if higher is None else higher
+    integer_b, fraction_b = _split(b)
+    if integer == integer_b:
+        return integer + _midpoint(fraction, fraction_b)
+    higher = _increment(integer)
+    if higher is None:
+        raise ValueError("Cannot increment any further")
+    return higher if higher < b else integer + _midpoint(fraction, None)
+
+
+def keys_between(a: Optional[str], b: Optional[str], n: int) -> List[str]:
+    """n increasing keys strictly between a and b, bisecting so they stay short."""
+    if n <= 0:
+        return []
+    if n == 1:
+        return [key_between(a, b)]
+    if b is None or a is None:
+        keys = []
+        key = a if b is None else b
+        for _ in range(n):
+            key = key_between(key, None) if b is None else key_between(None, key)
+            keys.append(key)
+        return keys if b is None else keys[::-1]
+    mid = n // 2
+    key = key_between(a, b)
+    return keys_between(a, key, mid) + [key] + keys_between(key, b, n - mid - 1)
+
+
+async def rank_next_to(db: AsyncSession, rank_column, scope, anchor: str, before: bool) -> str:
+    """A key directly before or after `anchor` among the rows matching `scope` (one index probe)."""
+    if before:
+        result = await db.execute(select(func.max(rank_column)).where(scope, rank_column < anchor))
+        return key_between(result.scalar(), anchor)
+    result = await db.execute(select(func.min(rank_column)).where(scope, rank_column > anchor))
+    return key_between(anchor, result.scalar())
+
+
+async def rank_at_end(db: AsyncSession, rank_column, scope, count: int = 1) -> List[str]:
+    """`count` keys after the last row matching `scope`."""
+    result = await db.execute(select(func.max(rank_column)).where(scope))
+    return keys_between(result.scalar(), None, count)
+
+
+async def rebalance_ranks(model, id_column, scenario_id: int) -> int:
+    """
+    Rewrites the rank of every `model` row (task or milestone) of the scenario as evenly
+    spaced short keys, keeping the current order. Runs in its own session, meant as a
+    background task after a move produced a key longer than MAX_RANK_LENGTH. Like moves,
+    it bumps the plan version, whose row lock keeps moves from using stale neighbours.
+    Returns the number of rows rewritten.
+    """
+    async with AsyncSessionLocal() as db:
+        version, _ = await bump_plan_version(db, scenario_id)
+        result = await db.execute(
+            select(id_column).where(model.scenario_id == scenario_id).order_by(model.rank, id_column)
+        )
+        ids = result.scalars().all()
+        if ids:
+            await db.execute(
+                update(model),
+                [{id_column.key: row_id, "rank": key} for row_id, key in zip(ids, keys_between(None, None, len(ids)))]
+            )
+            await publish_board_events(db, scenario_id, [scenario_event("changed", scenario_id)])
+        await db.commit()
+        carry_critical_path(scenario_id, version)
+        return len(ids)
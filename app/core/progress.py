@@ -0,0 +1,253 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from sqlalchemy import text, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Task statuses counted as completed
+DONE_STATUSES = ("done", "completed")
+
+# Seconds between reconciliation passes; any worker may run one, the advisory lock keeps it to one at a time
+RECONCILE_INTERVAL = 600
+RECONCILE_LOCK_KEY = 0x70726F67  # "prog"
+
+
+def progress_percent(task_count: int, tasks_done: int, duration_total: int, duration_done: int) -> Optional[int]:
+    """Completed share weighted by duration; by task count while no task has a duration. None without tasks."""
+    if duration_total > 0:
+        return round(100 * duration_done / duration_total)
+    if task_count > 0:
+        return round(100 * tasks_done / task_count)
+    return None
+
+
+def progress_stats(task_count: int, tasks_done: int, duration_total: int, duration_done: int) -> Dict[str, Optional[int]]:
+    """The counters in ProgressStats shape (ProjectStats and MilestoneResponse.stats)."""
+    return {
+        "scope": task_count,
+        "completed": tasks_done,
+        "progress": progress_percent(task_count, tasks_done, duration_total, duration_done),
+    }
+
+
+class ProgressDelta:
+    """
+    Counter changes caused by a task write: (tasks, done, duration, done duration) per
+    milestone and per scenario (applied to the scenario's project). Remove a task's old
+    values and add its new ones, then `apply_progress` in the same transaction.
+    """
+
+    def __init__(self):
+        self.milestones: Dict[int, List[int]] = {}
+        self.scenarios: Dict[int, List[int]] = {}
+
+    def add(
+        self,
+        scenario_id: Optional[int],
+        milestone_id: Optional[int],
+        status: Optional[str],
+        duration_days: Optional[int],
+        sign: int = 1
+    ) -> None:
+        duration = max(duration_days or 0, 0)
+        done = status in DONE_STATUSES
+        counts = (1, int(done), duration, duration if done else 0)
+        for key, totals in ((milestone_id, self.milestones), (scenario_id, self.scenarios)):
+            if key is None:
+                continue
+            row = totals.setdefault(key, [0, 0, 0, 0])
+            for index, count in enumerate(counts):
+                row[index] += sign * count
+
+    def remove(
+        self,
+        scenario_id: Optional[int],
+        milestone_id: Optional[int],
+        status: Optional[str],
+        duration_days: Optional[int]
+    ) -> None:
+        self.add(scenario_id, milestone_id, status, duration_days, sign=-1)
+
+
+def _columns(totals: Dict[int, List[int]]) -> Dict[str, list]:
+    rows = [(key, *counts) for key, counts in sorted(totals.items()) if any(counts)]
+    ids, tasks, done, duration, duration_done = (list(column) for column in zip(*rows)) if rows else ([],) * 5
+    return {"ids": ids, "tasks": tasks, "done": done, "duration": duration, "duration_done": duration_done}
+
+
+def _array_params(statement):
+    return statement.bindparams(*[
+        bindparam(name, type_=ARRAY(Integer)) for name in ("ids", "tasks", "done", "duration", "duration_done")
+    ])
+
+
+async def apply_progress(db: AsyncSession, delta: ProgressDelta) -> None:
+    """
+    Adds the delta to the counters: one UPDATE for milestones, one for projects (scenario
+    deltas summed per project). Relative updates, so concurrent writers never lose counts.
+    Projects' updated_at moves too, which keeps list and detail ETags honest. Call it after
+    the scenario locks (`bump_plan_version`): plan writers lock scenario rows, then task
+    rows, then counter rows, and counter rows in id order. Does not commit.
+    """
+    milestones = _columns(delta.milestones)
+    if len(milestones["ids"]) > 1:
+        await db.execute(
+            text("SELECT 1 FROM milestones WHERE milestone_id = ANY(:ids) ORDER BY milestone_id FOR UPDATE")
+            .bindparams(bindparam("ids", type_=ARRAY(Integer))),
+            {"ids": milestones["ids"]}
+        )
+    if milestones["ids"]:
+        await db.execute(
+            _array_params(text("""
+                UPDATE milestones m
+                SET task_count = m.task_count + v.tasks,
+                    tasks_done = m.tasks_done + v.done,
+                    duration_total = m.duration_total + v.duration,
+                    duration_done = m.duration_done + v.duration_done
+                FROM unnest(:ids, :tasks, :done, :duration, :duration_done)
+                    AS v(milestone_id, tasks, done, duration, duration_done)
+                WHERE m.milestone_id = v.milestone_id
+            """)),
+            milestones
+        )
+
+    scenarios = _columns(delta.scenarios)
+    if len(scenarios["ids"]) > 1:
+        await db.execute(
+            text("""
+                SELECT 1 FROM projects p JOIN scenarios s ON s.project_id = p.project_id
+                WHERE s.scenario_id = ANY(:ids)
+                ORDER BY p.project_id
+                FOR UPDATE OF p
+            """).bindparams(bindparam("ids", type_=ARRAY(Integer))),
+            {"ids": scenarios["ids"]}
+        )
+    if scenarios["ids"]:
+        await db.execute(
+            _array_params(text("""
+                UPDATE projects p
+                SET task_count = p.task_count + v.tasks,
+                    tasks_done = p.tasks_done + v.done,
+                    duration_total = p.duration_total + v.duration,
+                    duration_done = p.duration_done + v.duration_done,
+                    updated_at = now() AT TIME ZONE 'utc'
+                FROM (
+                    SELECT s.project_id, sum(d.tasks) AS tasks, sum(d.done) AS done,
+                           sum(d.duration) AS duration, sum(d.duration_done) AS duration_done
+                    FROM unnest(:ids, :tasks, :done, :duration, :duration_done)
+                        AS d(scenario_id, tasks, done, duration, duration_done)
+                    JOIN scenarios s ON s.scenario_id = d.scenario_id
+                    GROUP BY s.project_id
+                ) v
+                WHERE p.project_id = v.project_id
+            """)),
+            scenarios
+        )
+
+
+# Recounts a batch of rows from tasks and writes only those whose counters drifted
+RECONCILE_MILESTONES = """
+    UPDATE milestones m
+    SET task_count = c.tasks, tasks_done = c.done, duration_total = c.duration, duration_done = c.duration_done
+    FROM (
+        SELECT m.milestone_id,
+               count(t.id) AS tasks,
+               count(t.id) FILTER (WHERE t.status IN ('done', 'completed')) AS done,
+               coalesce(sum(greatest(t.duration_days, 0)), 0) AS duration,
+               coalesce(sum(greatest(t.duration_days, 0)) FILTER (WHERE t.status IN ('done', 'completed')), 0) AS duration_done
+        FROM milestones m
+        LEFT JOIN tasks t ON t.milestone_id = m.milestone_id
+        WHERE m.milestone_id = ANY(:ids)
+        GROUP BY m.milestone_id
+    ) c
+    WHERE m.milestone_id = c.milestone_id
+      AND (m.task_count, m.tasks_done, m.duration_total, m.duration_done)
+          IS DISTINCT FROM (c.tasks, c.done, c.duration, c.duration_done)
+"""
+
+RECONCILE_PROJECTS = """
+    UPDATE projects p
+    SET task_count = c.tasks, tasks_done = c.done, duration_total = c.duration, duration_done = c.duration_done,
+        updated_at = now() AT TIME ZONE 'utc'
+    FROM (
+        SELECT p.project_id,
+               count(t.id) AS tasks,
+               count(t.id) FILTER (WHERE t.status IN ('done', 'completed')) AS done,
+               coalesce(sum(greatest(t.duration_days, 0)), 0) AS duration,
+               coalesce(sum(greatest(t.duration_days, 0)) FILTER (WHERE t.status IN ('done', 'completed')), 0) AS duration_done
+        FROM projects p
+        LEFT JOIN scenarios s ON s.project_id = p.project_id
+        LEFT JOIN tasks t ON t.scenario_id = s.scenario_id
+        WHERE p.project_id = ANY(:ids)
+        GROUP BY p.project_id
+    ) c
+    WHERE p.project_id = c.project_id
+      AND (p.task_count, p.tasks_done, p.duration_total, p.duration_done)
+          IS DISTINCT FROM (c.tasks, c.done, c.duration, c.duration_done)
+"""
+
+# Counter rows locked and recounted per transaction, so task writers wait at most one batch
+RECONCILE_BATCH = 500
+
+
+async def reconcile_batches(conn: AsyncConnection, table: str, id_column: str, recount: str) -> int:
+    """
+    Recounts `table` in id order, one transaction per batch. The batch's rows are locked
+    first and counted in the next statement: under READ COMMITTED that statement sees
+    every writer that committed a delta to them, and no other delta can land until the
+    batch commits, so a recount never overwrites a concurrent writer's change.
+    """
+    fixed, after = 0, 0
+    while True:
+        result = await conn.execute(
+            text(f"SELECT {id_column} FROM {table} WHERE {id_column} > :after ORDER BY {id_column} LIMIT :limit FOR UPDATE"),
+            {"after": after, "limit": RECONCILE_BATCH}
+        )
+        ids = result.scalars().all()
+        if not ids:
+            await conn.commit()
+            return fixed
+        result = await conn.execute(text(recount).bindparams(bindparam("ids", type_=ARRAY(Integer))), {"ids": ids})
+        fixed += result.rowcount
+        await conn.commit()
+        after = ids[-1]
+
+
+async def reconcile_progress(conn: AsyncConnection) -> Optional[int]:
+    """
+    Recomputes every counter from the tasks table and fixes the ones that drifted (writes
+    outside the API, cascades that null a task's scenario). Returns the number of rows
+    fixed, or None if another worker is already reconciling. The advisory lock is held
+    by the connection across the batch transactions.
+    """
+    result = await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": RECONCILE_LOCK_KEY})
+    locked = result.scalar()
+    await conn.commit()
+    if not locked:
+        return None
+    try:
+        return (
+            await reconcile_batches(conn, "milestones", "milestone_id", RECONCILE_MILESTONES)
+            + await reconcile_batches(conn, "projects", "project_id", RECONCILE_PROJECTS)
+        )
+    finally:
+        await conn.rollback()
+        await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": RECONCILE_LOCK_KEY})
+        await conn.commit()
+
+
+async def periodic_progress_reconcile(engine: AsyncEngine) -> None:
+    while True:
+        await asyncio.sleep(RECONCILE_INTERVAL)
+        try:
+            async with engine.connect() as conn:
+                fixed = await reconcile_progress(conn)
+            if fixed:
+                logger.warning(f"Progress reconciler fixed {fixed} drifted counters")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Progress reconciliation failed: {e}")
@@ -0,0 +1,170 @@
+import logging
+from typing import Any, Iterable, List, Tuple
+from sqlalchemy import Numeric, cast, select, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import LRUCache
+from core.dag import IncrementalDAG, CycleError
+from models.project import Project
+from models.project_dependency import ProjectDependency
+
+logger = logging.getLogger(__name__)
+
+# user_id -> (dependency stamp, graph). Edges point from a dependency to its dependent,
+# so ancestors are upstream and descendants are downstream.
+graph_cache = LRUCache(maxsize=1_000)
+
+# Edge (u, v) is summed into the stamp as (u * EDGE_CODE_BASE + v) ** 2; project ids are 32-bit
+EDGE_CODE_BASE = 2 ** 32
+
+
+def parse_dependency_ids(values: Iterable[Any]) -> List[int]:
+    """Normalizes the `dependencies` MULTI_SELECT value to unique project ids (order kept)."""
+    ids = []
+    for value in values or []:
+        try:
+            project_id = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid project id in dependencies: {value!r}")
+        if project_id not in ids:
+            ids.append(project_id)
+    return ids
+
+
+async def build_dependency_graph(db: AsyncSession, user_id: int) -> IncrementalDAG:
+    """Builds the user's dependency graph from `project_dependencies`."""
+    graph = IncrementalDAG()
+    result = await db.execute(select(Project.project_id).where(Project.user_id == user_id))
+    for project_id in result.scalars():
+        graph.add_node(project_id)
+
+    result = await db.execute(
+        select(ProjectDependency.depends_on_project_id, ProjectDependency.project_id)
+        .join(Project, Project.project_id == ProjectDependency.project_id)
+        .where(Project.user_id == user_id)
+    )
+    for depends_on, project_id in result:
+        try:
+            graph.add_edge(depends_on, project_id)
+        except CycleError as e:
+            # Only possible for rows written before cycles were rejected
+            logger.warning(f"Ignoring cyclic project dependency for user {user_id}: {e}")
+    return graph
+
+
+def dependency_stamp(graph: IncrementalDAG) -> Tuple[int, int, int, int]:
+    """
+    (projects, sum of project ids, edges, sum of edge codes) of a graph; equals
+    `get_dependency_stamp` while the graph matches the tables.
+    """
+    return (
+        len(graph),
+        sum(graph.ord),
+        len(graph.edges),
+        sum((u * EDGE_CODE_BASE + v) ** 2 for u, v in graph.edges),
+    )
+
+
+async def get_dependency_stamp(db: AsyncSession, user_id: int) -> Tuple[int, int, int, int]:
+    """
+    The same stamp computed from `projects` and `project_dependencies`. Only adding or removing
+    projects or edges changes it (ids are never reused), so property edits and progress counter
+    updates, which move updated_at, leave the cached graph valid.
+    """
+    projects = await db.execute(
+        select(func.count(), func.coalesce(func.sum(Project.project_id), 0)).where(Project.user_id == user_id)
+    )
+    code = cast(ProjectDependency.depends_on_project_id, Numeric) * EDGE_CODE_BASE + ProjectDependency.project_id
+    edges = await db.execute(
+        select(func.count(), func.coalesce(func.sum(code * code), 0))
+        .join(Project, Project.project_id == ProjectDependency.project_id)
+        .where(Project.user_id == user_id)
+    )
+    return (*projects.one(), *edges.one())
+
+
+async def load_dependency_graph(db: AsyncSession, user_id: int) -> IncrementalDAG:
+    """
+    Returns the user's dependency graph for reading, rebuilding it only when the tables
+    no longer match the cached copy.
+    """
+    stamp = await get_dependency_stamp(db, user_id)
+    cached = graph_cache.get(user_id)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    graph = await build_dependency_graph(db, user_id)
+    remember_dependency_graph(user_id, graph)
+    return graph
+
+
+async def take_dependency_graph(db: AsyncSession, user_id: int) -> IncrementalDAG:
+    """
+    Like `load_dependency_graph`, but takes the cached copy out of the cache: writers mutate
+    it and put it back with `remember_dependency_graph` only once their transaction has
+    committed, so a failed write leaves no phantom edges and readers never see uncommitted ones.
+    Call it before the transaction inserts or deletes projects, or the stamps won't match.
+    """
+    stamp = await get_dependency_stamp(db, user_id)
+    cached = graph_cache.pop(user_id)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    return await build_dependency_graph(db, user_id)
+
+
+def remember_dependency_graph(user_id: int, graph: IncrementalDAG) -> None:
+    """Caches a graph that matches the committed tables, tagged with its own stamp."""
+    graph_cache.set(user_id, (dependency_stamp(graph), graph))
+
+
+def forget_dependency_graph(user_id: int) -> None:
+    graph_cache.pop(user_id)
+
+
+async def lock_dependency_graph(db: AsyncSession, user_id: int) -> None:
+    """Serializes dependency writes per user across workers until the transaction ends."""
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(f"project_dependencies:{user_id}", 0))))
+
+
+async def set_project_dependencies(
+    db: AsyncSession,
+    graph: IncrementalDAG,
+    project_id: int,
+    dependency_ids: List[int]
+) -> None:
+    """
+    Makes `project_id` depend on exactly `dependency_ids`, in the graph and in the edge table.
+    Raises ValueError for ids outside the user's projects and CycleError (graph untouched)
+    if the new edges would close a cycle. Does not commit.
+    """
+    unknown = [dep for dep in dependency_ids if dep not in graph and dep != project_id]
+    if unknown:
+        raise ValueError(f"Unknown projects in dependencies: {', '.join(map(str, unknown))}")
+
+    graph.add_node(project_id)
+    current = set(graph.pred[project_id])
+    wanted = set(dependency_ids)
+    removed = current - wanted
+    added = [dep for dep in dependency_ids if dep not in current]
+
+    for dep in removed:
+        graph.remove_edge(dep, project_id)
+    try:
+        graph.add_edges((dep, project_id) for dep in added)
+    except CycleError:
+        for dep in removed:
+            graph.add_edge(dep, project_id)
+        raise
+
+    if removed:
+        await db.execute(
+            delete(ProjectDependency)
+            .where(ProjectDependency.project_id == project_id)
+            .where(ProjectDependency.depends_on_project_id.in_(removed))
+        )
+    if added:
+        await db.execute(
+            insert(ProjectDependency)
+            .values([{"project_id": project_id, "depends_on_project_id": dep} for dep in added])
+            .on_conflict_do_nothing()
+        )
@@ -0,0 +1,146 @@
+import csv
+import io
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.property_registry import PropertyType, TenantSchema, schema_properties
+from core.property_factory import validate_properties_batch
+
+# Rows validated and COPY'd per batch
+IMPORT_CHUNK_SIZE = 2_000
+# Row errors returned to the client; the total is always reported
+MAX_REPORTED_ERRORS = 1_000
+
+STAGING_TABLE = "project_import_staging"
+
+
+def read_ndjson(stream: io.TextIOBase) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yields (row number, record) for every non-blank line; unparsable lines yield an error marker."""
+    for row_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield row_number, {"__error__": f"Invalid JSON: {e}"}
+            continue
+        if not isinstance(record, dict):
+            yield row_number, {"__error__": "Expected a JSON object"}
+            continue
+        yield row_number, record
+
+
+def read_csv(
+    entity_type: str,
+    stream: io.TextIOBase,
+    schema: Optional[TenantSchema] = None
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Reverses the export's flattening: `a; b` lists for MULTI_SELECT, JSON text for JSON properties."""
+    types = {prop["key"]: prop["type"] for prop in schema_properties(entity_type, schema)}
+    for row_number, row in enumerate(csv.DictReader(stream), start=1):
+        record: Dict[str, Any] = {}
+        try:
+            for column, value in row.items():
+                if column is None or value is None or value == "":
+                    continue
+                prop_type = types.get(column)
+                if prop_type == PropertyType.MULTI_SELECT:
+                    value = [item.strip() for item in value.split(";") if item.strip()]
+                elif prop_type == PropertyType.JSON:
+                    value = orjson.loads(value)
+                record[column] = value
+        except orjson.JSONDecodeError as e:
+            record = {"__error__": f"Invalid JSON in column '{column}': {e}"}
+        yield row_number, record
+
+
+def split_record(
+    entity_type: str,
+    record: Dict[str, Any],
+    schema: Optional[TenantSchema] = None
+) -> Tuple[Dict[str, Any], Optional[Any]]:
+    """
+    Accepts either {"properties": {...}, "lead_id": ...} or the flat export layout
+    (registry keys at the top level) and returns (properties, lead_id).
+    """
+    if isinstance(record.get("properties"), dict):
+        properties = dict(record["properties"])
+    else:
+        keys = {prop["key"] for prop in schema_properties(entity_type, schema)}
+        properties = {key: value for key, value in record.items() if key in keys}
+    return properties, record.get("lead_id")
+
+
+def format_validation_error(error: ValidationError) -> List[str]:
+    return [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in error.errors()]
+
+
+def validate_chunk(
+    entity_type: str,
+    chunk: List[Tuple[int, Dict[str, Any]]],
+    errors: List[Dict[str, Any]],
+    schema: Optional[TenantSchema] = None
+) -> List[Tuple[str, Optional[int]]]:
+    """Validates a chunk of records; returns staging rows (properties JSON, lead_id) and appends row errors."""
+    staged = []
+    for row_number, record in chunk:
+        if "__error__" in record:
+            errors.append({"row": row_number, "errors": [record["__error__"]]})
+            continue
+
+        properties, lead_id = split_record(entity_type, record, schema)
+        try:
+            lead_id = int(lead_id) if lead_id not in (None, "") else None
+        except (TypeError, ValueError):
+            errors.append({"row": row_number, "errors": [f"lead_id: invalid user id {lead_id!r}"]})
+            continue
+        staged.append((row_number, properties, lead_id))
+
+    instances, row_errors = validate_properties_batch(
+        entity_type, [properties for _, properties, _ in staged], schema
+    )
+
+    valid = []
+    for index, (row_number, _, lead_id) in enumerate(staged):
+        if index in row_errors:
+            errors.append({"row": row_number, "errors": format_validation_error(row_errors[index])})
+            continue
+        properties = instances[index].model_dump(mode="json")
+        # Dependency ids point at projects of the source workspace, so they are not carried over
+        properties["dependencies"] = []
+        valid.append((orjson.dumps(properties).decode(), lead_id))
+    return valid
+
+
+async def create_staging_table(db: AsyncSession) -> None:
+    await db.execute(text(
+        f"CREATE TEMP TABLE {STAGING_TABLE} (properties jsonb NOT NULL, lead_id bigint) ON COMMIT DROP"
+    ))
+
+
+async def copy_to_staging(db: AsyncSession, rows: List[Tuple[str, Optional[int]]]) -> None:
+    """Loads rows with COPY over the session's own asyncpg connection (same transaction)."""
+    if not rows:
+        return
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        STAGING_TABLE, records=rows, columns=["properties", "lead_id"]
+    )
+
+
+async def merge_staging(db: AsyncSession, user_id: int) -> int:
+    """Moves staged rows into projects in one statement. Unknown lead ids are dropped to NULL."""
+    result = await db.execute(
+        text(f"""
+            INSERT INTO projects (user_id, properties, lead_id, created_at, updated_at)
+            SELECT :user_id, s.properties, u.id, now() AT TIME ZONE 'utc', now() AT TIME ZONE 'utc'
+            FROM {STAGING_TABLE} s
+            LEFT JOIN users u ON u.id = s.lead_id
+        """),
+        {"user_id": user_id}
+    )
+    return result.rowcount
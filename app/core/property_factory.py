@@ -1,18 +1,25 @@
-from typing import Any, Dict, List, Optional, Type
-from pydantic import BaseModel, Field, create_model
-from core.property_registry import PropertyType, get_entity_schema
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, create_model
+from core.cache import LRUCache
+from core.property_registry import PropertyType, TenantSchema, registry_schema, schema_properties
 
 def create_pydantic_model_from_schema(
     entity_type: str, 
-    base_class: Type[BaseModel] = BaseModel
+    base_class: Type[BaseModel] = BaseModel,
+    schema: Optional[TenantSchema] = None,
+    exclude_hidden: bool = False
 ) -> Type[BaseModel]:
     """
     Dynamically creates a Pydantic model based on the property registry for the given entity type.
     
     Args:
         entity_type: The entity type (e.g., "project")
+        schema: A tenant's schema (registry plus custom properties); defaults to the registry
+        exclude_hidden: Leave properties with `visible: False` out of dumps. Only for response
+            models; validation models must keep them or writes would drop stored values.
     """
-    schema = get_entity_schema(entity_type)
+    schema = schema_properties(entity_type, schema)
     fields = {}
 
     for prop in schema:
@@ -23,6 +30,9 @@ def create_pydantic_model_from_schema(
         # Determine Python type based on PropertyType
         field_type = object # Default fallback
         default_value = prop.get("default", None)
+        if isinstance(default_value, tuple):
+            # Frozen schemas store list defaults as tuples
+            default_value = list(default_value)
         
         if prop["type"] == PropertyType.NUMBER:
             field_type = float | int
@@ -43,7 +53,7 @@ def create_pydantic_model_from_schema(
         # Handle visibility
         visible = prop.get("visible", True)
         field_info_kwargs = {}
-        if not visible:
+        if exclude_hidden and not visible:
             field_info_kwargs["exclude"] = True
 
         # Handle required vs optional
@@ -63,13 +73,149 @@ def create_pydantic_model_from_schema(
     
     model_name = f"{entity_type.capitalize()}Properties"
     
+    if exclude_hidden:
+        model_name = f"{model_name}Response"
+    
     return create_model(
         model_name,
         __config__=model_config,
         **fields
     )
 
-def validate_properties(entity_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
-    Model = create_pydantic_model_from_schema(entity_type)
-    instance = Model(**data)
+@dataclass(frozen=True)
+class CompiledValidator:
+    """
+    Prebuilt properties model for one schema, plus adapters for single rows and batches
+    and the trusted serializers built from it (one per `include` subset).
+    `model` validates writes and keeps every property; `response_model` drops hidden ones.
+    """
+    properties: Tuple[Mapping[str, Any], ...]
+    model: Type[BaseModel]
+    response_model: Type[BaseModel]
+    adapter: TypeAdapter
+    batch_adapter: TypeAdapter
+    serializers: Dict[Optional[tuple[str, ...]], Callable] = field(default_factory=dict, compare=False)
+
+# Trusted serializers kept per compiled validator; distinct sparse fieldsets beyond this evict the oldest
+MAX_SERIALIZERS_PER_VALIDATOR = 64
+
+# Total properties across cached validators. Model size grows with the field count, so this
+# bounds memory however many tenants there are, rather than the number of schemas.
+VALIDATOR_CACHE_WEIGHT = 20_000
+
+# (entity_type, registry version, tenant fingerprint) -> CompiledValidator
+_compiled_validators = LRUCache(
+    maxsize=VALIDATOR_CACHE_WEIGHT,
+    weigher=lambda compiled: len(compiled.properties) + 1
+)
+
+def get_compiled_validator(entity_type: str, schema: Optional[TenantSchema] = None) -> CompiledValidator:
+    """
+    Returns the compiled validator for a schema (the registry's by default), building it on first use.
+    Compilation happens once per distinct schema instead of per call; tenants with identical
+    custom properties share one entry.
+    """
+    if schema is None:
+        schema = registry_schema(entity_type)
+    key = (entity_type, schema.registry_version, schema.fingerprint)
+    compiled = _compiled_validators.get(key)
+    if compiled is None:
+        model = create_pydantic_model_from_schema(entity_type, schema=schema)
+        response_model = model
+        if any(not prop.get("visible", True) for prop in schema.properties):
+            response_model = create_pydantic_model_from_schema(entity_type, schema=schema, exclude_hidden=True)
+        compiled = CompiledValidator(
+            properties=schema.properties,
+            model=model,
+            response_model=response_model,
+            adapter=TypeAdapter(model),
+            batch_adapter=TypeAdapter(List[model]),
+        )
+        _compiled_validators.set(key, compiled)
+    return compiled
+
+def invalidate_validators(entity_type: Optional[str] = None) -> None:
+    """Drops compiled validators and their serializers (all, or one entity type's) after a registry change."""
+    for key in _compiled_validators.keys():
+        if entity_type is None or key[0] == entity_type:
+            _compiled_validators.pop(key)
+
+def validate_properties(entity_type: str, data: Dict[str, Any], schema: Optional[TenantSchema] = None) -> Dict[str, Any]:
+    instance = get_compiled_validator(entity_type, schema).adapter.validate_python(data)
     return instance.model_dump(exclude_unset=True)
+
+def validate_properties_batch(
+    entity_type: str,
+    rows: List[Dict[str, Any]],
+    schema: Optional[TenantSchema] = None
+) -> Tuple[List[Optional[BaseModel]], Dict[int, ValidationError]]:
+    """
+    Validates many rows at once. Returns one instance per row (None where invalid)
+    and the errors keyed by row index. The happy path is a single validator call.
+    """
+    compiled = get_compiled_validator(entity_type, schema)
+    try:
+        return compiled.batch_adapter.validate_python(rows), {}
+    except ValidationError:
+        pass
+
+    # Some rows are invalid: validate individually to keep the good ones
+    instances: List[Optional[BaseModel]] = []
+    errors: Dict[int, ValidationError] = {}
+    for index, row in enumerate(rows):
+        try:
+            instances.append(compiled.adapter.validate_python(row))
+        except ValidationError as e:
+            instances.append(None)
+            errors[index] = e
+    return instances, errors
+
+def build_trusted_serializer(
+    entity_type: str,
+    include: Optional[tuple[str, ...]] = None,
+    schema: Optional[TenantSchema] = None
+) -> Callable[[Optional[Dict[str, Any]]], Dict[str, Any]]:
+    """
+    Returns a function that prepares stored properties for output without re-validating them.
+    Stored properties were validated on write, so reads only need what the response model
+    would otherwise add: registry defaults for missing keys and dropping hidden properties.
+    """
+    compiled = get_compiled_validator(entity_type, schema)
+    serialize = compiled.serializers.get(include)
+    if serialize is None:
+        serialize = _build_trusted_serializer(compiled.properties, include)
+        if len(compiled.serializers) >= MAX_SERIALIZERS_PER_VALIDATOR:
+            compiled.serializers.pop(next(iter(compiled.serializers)))
+        compiled.serializers[include] = serialize
+    return serialize
+
+def _build_trusted_serializer(
+    properties: Tuple[Mapping[str, Any], ...],
+    include: Optional[tuple[str, ...]]
+) -> Callable[[Optional[Dict[str, Any]]], Dict[str, Any]]:
+    schema = properties
+    if include is not None:
+        schema = [prop for prop in schema if prop["key"] in include]
+
+    defaults = {}
+    for prop in schema:
+        default_value = prop.get("default", None)
+        if isinstance(default_value, tuple):
+            default_value = list(default_value)
+        if default_value is None and prop["type"] == PropertyType.MULTI_SELECT:
+            default_value = []
+        if default_value is not None or not prop.get("required", False):
+            defaults[prop["key"]] = default_value
+    hidden = {prop["key"] for prop in schema if not prop.get("visible", True)}
+    keys = {prop["key"] for prop in schema}
+
+    def serialize(properties: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        properties = properties or {}
+        if include is not None:
+            properties = {key: value for key, value in properties.items() if key in keys and value is not None}
+        data = {**defaults, **properties}
+        for key in hidden:
+            data.pop(key, None)
+        return data
+
+    return serialize
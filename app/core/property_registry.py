@@ -1,4 +1,6 @@
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Dict, Any, Iterable, Mapping, Optional, Sequence, Tuple
 from enum import Enum
 
 class PropertyType(str, Enum):
@@ -92,27 +94,88 @@ PROPERTIES_REGISTRY: Dict[str, List[Dict[str, Any]]] = {
     ]
 }
 
+# Bumped whenever PROPERTIES_REGISTRY changes; compiled validators are keyed by it
+_registry_version = 0
+
+def get_registry_version() -> int:
+    return _registry_version
+
+def register_entity_schema(entity_type: str, schema: List[Dict[str, Any]]) -> None:
+    """
+    Replaces the schema of an entity type. Compiled validators built for the previous
+    registry version stop being served; call `invalidate_validators` to free them.
+    """
+    global _registry_version
+    PROPERTIES_REGISTRY[entity_type] = schema
+    _registry_version += 1
+
 def get_entity_schema(entity_type: str) -> List[Dict[str, Any]]:
     return PROPERTIES_REGISTRY.get(entity_type, [])
 
-def apply_user_preferences(schema: List[Dict[str, Any]], preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
+def freeze_properties(properties: Iterable[Mapping[str, Any]]) -> Tuple[Mapping[str, Any], ...]:
+    return tuple(
+        MappingProxyType({k: tuple(v) if isinstance(v, list) else v for k, v in prop.items()})
+        for prop in properties
+    )
+
+# (entity_type, registry version) -> read-only schema
+_frozen_schemas: Dict[Tuple[str, int], Tuple[Mapping[str, Any], ...]] = {}
+
+def get_frozen_schema(entity_type: str) -> Tuple[Mapping[str, Any], ...]:
     """
-    Applies user preferences to the schema.
-    Overrides the 'visible' attribute if the key exists in preferences.
-    preferences structure: {"property_key": {"visible": bool}}
-    Always returns a deep copy to avoid mutating the global registry.
+    Read-only view of an entity schema, built once per registry version.
+    Safe to share between requests: callers get a TypeError instead of mutating the registry.
     """
-    import copy
-    schema_copy = copy.deepcopy(schema)
+    key = (entity_type, _registry_version)
+    frozen = _frozen_schemas.get(key)
+    if frozen is None:
+        frozen = freeze_properties(get_entity_schema(entity_type))
+        _frozen_schemas[key] = frozen
+    return frozen
 
-    if not preferences:
-        return schema_copy
+@dataclass(frozen=True)
+class TenantSchema:
+    """
+    An entity schema as one tenant sees it: the registry properties followed by the
+    tenant's custom ones (see core.custom_properties). Tenants with the same custom
+    properties have the same fingerprint and share compiled validators.
+    """
+    entity_type: str
+    properties: Tuple[Mapping[str, Any], ...]
+    # "" when the tenant has no custom properties
+    fingerprint: str = ""
+    registry_version: int = 0
+
+def registry_schema(entity_type: str) -> TenantSchema:
+    """The schema of a tenant without custom properties."""
+    return TenantSchema(entity_type, get_frozen_schema(entity_type), "", _registry_version)
+
+def schema_properties(entity_type: str, schema: Optional[TenantSchema] = None) -> Sequence[Mapping[str, Any]]:
+    return schema.properties if schema is not None else get_entity_schema(entity_type)
+
+def get_property_keys(entity_type: str, schema: Optional[TenantSchema] = None) -> List[str]:
+    return [prop["key"] for prop in schema_properties(entity_type, schema)]
+
+def get_property(entity_type: str, key: str, schema: Optional[TenantSchema] = None) -> Optional[Mapping[str, Any]]:
+    return next((prop for prop in schema_properties(entity_type, schema) if prop["key"] == key), None)
 
-    for prop in schema_copy:
-        key = prop.get("key")
-        if key in preferences:
-            user_pref = preferences[key]
-            if "visible" in user_pref:
-                prop["visible"] = user_pref["visible"]
+# Property types that can be counted with GROUP BY
+GROUPABLE_PROPERTY_TYPES = (PropertyType.SELECT, PropertyType.STATUS, PropertyType.USER, PropertyType.MULTI_SELECT)
 
-    return schema_copy
+def apply_user_preferences(schema: Sequence[Mapping[str, Any]], preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Applies user preferences to the schema.
+    Overrides the 'visible' attribute if the key exists in preferences.
+    preferences structure: {"property_key": {"visible": bool}}
+    Returns new top-level dicts (the registry is never mutated); nested values such as
+    `options` are shared with the schema and must be treated as read-only.
+    """
+    preferences = preferences or {}
+    personalized = []
+    for prop in schema:
+        prop = dict(prop)
+        user_pref = preferences.get(prop.get("key"))
+        if user_pref and "visible" in user_pref:
+            prop["visible"] = user_pref["visible"]
+        personalized.append(prop)
+    return personalized
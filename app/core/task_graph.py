@@ -0,0 +1,42 @@
+from typing import Dict
+from sqlalchemy import select, func, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from models.task_dependency import TaskDependency
+
+# Deepest level an impact query walks; also what stops a walk around a cycle
+MAX_IMPACT_DEPTH = 500
+
+
+async def walk_dependencies(db: AsyncSession, task_id: int, upstream: bool, max_depth: int) -> Dict[int, int]:
+    """
+    Tasks the given task (transitively) depends on (upstream) or that depend on it
+    (downstream), with their shortest distance in edges, in one recursive CTE.
+    UNION drops repeated (task, depth) rows, so a plan with many converging paths adds
+    at most one row per task and level instead of one per path, and the depth bound
+    ends the walk even if the graph contains a cycle.
+    """
+    def step(edge):
+        # (column matched against the current task, column holding the next task)
+        return (edge.task_id, edge.depends_on_task_id) if upstream else (edge.depends_on_task_id, edge.task_id)
+
+    source, target = step(TaskDependency)
+    walk = (
+        select(target.label("task_id"), literal(1).label("depth"))
+        .where(source == task_id)
+        .cte("walk", recursive=True)
+    )
+    edge = aliased(TaskDependency)
+    source, target = step(edge)
+    walk = walk.union(
+        select(target, walk.c.depth + 1)
+        .join(walk, source == walk.c.task_id)
+        .where(walk.c.depth < max_depth)
+    )
+    result = await db.execute(
+        select(walk.c.task_id, func.min(walk.c.depth))
+        .where(walk.c.task_id != task_id)
+        .group_by(walk.c.task_id)
+    )
+    return dict(result.all())
@@ -0,0 +1,155 @@
+import bisect
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import LRUCache
+from core.critical_path import CriticalPath
+from models.scenario import Milestone
+from models.task import Task
+
+# scenario_id -> (plan version, Timeline). Like the schedule cache, a hit is only used if
+# the scenario's plan_version still matches; task writes bump it and patch the entry.
+timeline_cache = LRUCache(maxsize=1_000)
+
+
+class Timeline:
+    """
+    Gantt layout of a scenario, served as columns: one entry per task in (rank, id) order,
+    with dependency edges and milestones referring to tasks by column index. Offsets are
+    days from the scenario start, as computed by CriticalPath. Task writes patch the
+    layout in place; the encoded body is rebuilt on the next read after a change.
+    Only tasks the schedule covers are laid out: task rows are read after the schedule,
+    so ones committed in between are left to the next plan version.
+    """
+
+    def __init__(self, scenario_id: int, schedule: CriticalPath, tasks: Iterable, milestones: Iterable):
+        self.scenario_id = scenario_id
+        self.start = schedule.start
+        self.finish = schedule.finish
+        self.milestone_ids: List[int] = []
+        self.milestone_titles: List[str] = []
+        for milestone in milestones:
+            self.milestone_ids.append(milestone.milestone_id)
+            self.milestone_titles.append(milestone.title)
+        # task_id -> (rank, title, status, milestone_id)
+        self.fields: Dict[int, Tuple[str, str, str, Optional[int]]] = {}
+        for task in tasks:
+            if task.id in schedule.duration:
+                self.fields[task.id] = (task.rank, task.title, task.status, task.milestone_id)
+        # (rank, task_id), kept sorted
+        self.order: List[Tuple[str, int]] = sorted((fields[0], task_id) for task_id, fields in self.fields.items())
+        # task_id -> (start, end, critical)
+        self.dates: Dict[int, Tuple[int, int, bool]] = {}
+        self.predecessors: Dict[int, List[int]] = {}
+        self.set_dates(schedule)
+        for task_id in self.fields:
+            self.predecessors[task_id] = sorted(dep for dep in schedule.graph.pred[task_id] if dep in self.fields)
+        self._body: Optional[bytes] = None
+
+    def set_dates(self, schedule: CriticalPath, task_ids: Optional[Iterable[int]] = None) -> None:
+        """Copies the schedule of `task_ids` (default: all tasks)."""
+        for task_id in schedule.duration if task_ids is None else task_ids:
+            if task_id in self.fields:
+                self.dates[task_id] = (schedule.es[task_id], schedule.ef[task_id], schedule.is_critical(task_id))
+        self.finish = schedule.finish
+        self._body = None
+
+    def set_task(self, task: Task) -> None:
+        """Takes over a task's rank, title, status and milestone."""
+        rank = self.fields[task.id][0]
+        if rank != task.rank:
+            del self.order[bisect.bisect_left(self.order, (rank, task.id))]
+            bisect.insort(self.order, (task.rank, task.id))
+        self.fields[task.id] = (task.rank, task.title, task.status, task.milestone_id)
+        self._body = None
+
+    def set_predecessors(self, task_id: int, depends_on: Iterable[int]) -> None:
+        self.predecessors[task_id] = sorted(dep for dep in set(depends_on) if dep in self.fields)
+        self._body = None
+
+    def body(self) -> bytes:
+        if self._body is None:
+            task_ids = [task_id for _, task_id in self.order]
+            column = {task_id: index for index, task_id in enumerate(task_ids)}
+            lane_of = {milestone_id: lane for lane, milestone_id in enumerate(self.milestone_ids)}
+            # Tasks outside the scenario's milestones share the last lane
+            lanes = [lane_of.get(self.fields[task_id][3], len(self.milestone_ids)) for task_id in task_ids]
+            starts = [self.dates[task_id][0] for task_id in task_ids]
+            ends = [self.dates[task_id][1] for task_id in task_ids]
+
+            milestone_starts: List[Optional[int]] = [None] * len(self.milestone_ids)
+            milestone_ends: List[Optional[int]] = [None] * len(self.milestone_ids)
+            for lane, start, end in zip(lanes, starts, ends):
+                if lane < len(self.milestone_ids):
+                    if milestone_starts[lane] is None or start < milestone_starts[lane]:
+                        milestone_starts[lane] = start
+                    if milestone_ends[lane] is None or end > milestone_ends[lane]:
+                        milestone_ends[lane] = end
+
+            sources, targets = [], []
+            for task_id in task_ids:
+                for dep in self.predecessors.get(task_id, ()):
+                    sources.append(column[dep])
+                    targets.append(column[task_id])
+
+            self._body = orjson.dumps({
+                "scenario_id": self.scenario_id,
+                "start_date": self.start,
+                "end_date": self.start + timedelta(days=self.finish),
+                "duration_days": self.finish,
+                "tasks": {
+                    "id": task_ids,
+                    "title": [self.fields[task_id][1] for task_id in task_ids],
+                    "status": [self.fields[task_id][2] for task_id in task_ids],
+                    "start": starts,
+                    "end": ends,
+                    "critical": [self.dates[task_id][2] for task_id in task_ids],
+                    "lane": lanes,
+                },
+                "dependencies": {"from": sources, "to": targets},
+                "milestones": {
+                    "id": self.milestone_ids,
+                    "title": self.milestone_titles,
+                    "start": milestone_starts,
+                    "end": milestone_ends,
+                },
+            })
+        return self._body
+
+
+async def load_timeline(db: AsyncSession, scenario_id: int, schedule: CriticalPath) -> Timeline:
+    tasks = await db.execute(
+        select(Task.id, Task.title, Task.status, Task.milestone_id, Task.rank).where(Task.scenario_id == scenario_id)
+    )
+    milestones = await db.execute(
+        select(Milestone.milestone_id, Milestone.title)
+        .where(Milestone.scenario_id == scenario_id)
+        .order_by(Milestone.rank, Milestone.milestone_id)
+    )
+    return Timeline(scenario_id, schedule, tasks.all(), milestones.all())
+
+
+def get_cached_timeline(scenario_id: int, version: int, start: date) -> Optional[Timeline]:
+    cached = timeline_cache.get(scenario_id)
+    if cached is not None and cached[0] == version and cached[1].start == start:
+        return cached[1]
+    return None
+
+
+def take_timeline(scenario_id: int, version: int, start: date) -> Optional[Timeline]:
+    """
+    Takes the timeline cached for `version` out of the cache, for a writer to patch and
+    put back with `remember_timeline` under its new version once it has committed.
+    """
+    cached = timeline_cache.pop(scenario_id)
+    if cached is not None and cached[0] == version and cached[1].start == start:
+        return cached[1]
+    return None
+
+
+def remember_timeline(scenario_id: int, version: int, timeline: Optional[Timeline]) -> None:
+    if timeline is not None:
+        timeline_cache.set(scenario_id, (version, timeline))
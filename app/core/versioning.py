@@ -0,0 +1,116 @@
+from typing import Any, Dict, List, Optional
+import jsonpatch
+import orjson
+import zstandard
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.project import Project
+from models.version import ProjectVersion
+
+# A full snapshot is stored every K versions, so rebuilding any version
+# costs one checkpoint plus at most K - 1 patch applications
+CHECKPOINT_INTERVAL = 20
+
+_compressor = zstandard.ZstdCompressor(level=10)
+_decompressor = zstandard.ZstdDecompressor()
+
+
+def project_state(project: Project) -> Dict[str, Any]:
+    """The versioned part of a project, normalized to plain JSON types (dates as strings)."""
+    return orjson.loads(orjson.dumps({"properties": project.properties or {}, "lead_id": project.lead_id}))
+
+
+def encode_payload(value: Any) -> bytes:
+    return _compressor.compress(orjson.dumps(value))
+
+
+def decode_payload(payload: bytes) -> Any:
+    return orjson.loads(_decompressor.decompress(payload))
+
+
+def summarize_patch(patch: List[Dict[str, Any]]) -> str:
+    # "/properties/status" -> "status"
+    keys = []
+    for op in patch:
+        parts = op["path"].split("/")
+        key = parts[2] if parts[1] == "properties" and len(parts) > 2 else parts[1]
+        if key not in keys:
+            keys.append(key)
+    return f"Updated {', '.join(keys)}" if keys else "No changes"
+
+
+async def record_version(
+    db: AsyncSession,
+    project: Project,
+    previous_state: Optional[Dict[str, Any]] = None
+) -> Optional[ProjectVersion]:
+    """
+    Adds the project's current state as its next version (not committed).
+    Callers should hold a row lock on the project so version numbers don't race.
+    Returns None when nothing versioned changed. A project without history yet (created
+    before versioning, or imported) first gets `previous_state` as its baseline.
+    """
+    state = project_state(project)
+    if previous_state is not None and state == previous_state:
+        return None
+    result = await db.execute(
+        select(func.max(ProjectVersion.version_number)).where(ProjectVersion.project_id == project.project_id)
+    )
+    last_number = result.scalar() or 0
+    if last_number == 0 and previous_state is not None:
+        db.add(ProjectVersion(
+            project_id=project.project_id,
+            version_number=1,
+            change_summary="Baseline",
+            is_checkpoint=True,
+            payload=encode_payload(previous_state),
+        ))
+        last_number = 1
+    number = last_number + 1
+
+    if last_number == 0 or previous_state is None or last_number % CHECKPOINT_INTERVAL == 0:
+        version = ProjectVersion(
+            project_id=project.project_id,
+            version_number=number,
+            change_summary="Created" if last_number == 0 else "Checkpoint",
+            is_checkpoint=True,
+            payload=encode_payload(state),
+        )
+    else:
+        patch = jsonpatch.make_patch(previous_state, state).patch
+        version = ProjectVersion(
+            project_id=project.project_id,
+            version_number=number,
+            change_summary=summarize_patch(patch),
+            is_checkpoint=False,
+            payload=encode_payload(patch),
+        )
+
+    db.add(version)
+    return version
+
+
+async def load_version_state(db: AsyncSession, project_id: int, version_number: int) -> Optional[Dict[str, Any]]:
+    """Rebuilds a version from its nearest checkpoint in a single query."""
+    checkpoint = (
+        select(func.max(ProjectVersion.version_number))
+        .where(ProjectVersion.project_id == project_id)
+        .where(ProjectVersion.is_checkpoint.is_(True))
+        .where(ProjectVersion.version_number <= version_number)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(ProjectVersion.version_number, ProjectVersion.is_checkpoint, ProjectVersion.payload)
+        .where(ProjectVersion.project_id == project_id)
+        .where(ProjectVersion.version_number.between(checkpoint, version_number))
+        .order_by(ProjectVersion.version_number)
+    )
+    rows = result.all()
+    if not rows or rows[-1].version_number != version_number:
+        return None
+
+    state = decode_payload(rows[0].payload)
+    for row in rows[1:]:
+        state = jsonpatch.apply_patch(state, decode_payload(row.payload), in_place=True)
+    return state
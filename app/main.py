@@ -14,6 +14,10 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from api.v1.router import api_router
 from core.database import engine, AsyncSessionLocal
 from core.config import settings
+from core.custom_properties import schema_listener
+from core.board_events import board_listener
+from core.notifications import listen_for_notifications
+from core.progress import periodic_progress_reconcile
 
 # Import all models to ensure they are registered with SQLAlchemy
 from models.base import Base
@@ -29,6 +33,8 @@ from models.conversation import ConversationLog
 from models.version import ProjectVersion
 from models.task import Task
 from models.project import Project
+from models.project_dependency import ProjectDependency
+from models.custom_property import CustomProperty
 # Add other models if needed
 
 
@@ -49,17 +55,23 @@ async def periodic_health_check():
 async def lifespan(app: FastAPI):
     # Start background health check
     health_check_task = asyncio.create_task(periodic_health_check())
+    # One connection outside the pool: drops cached custom property schemas when any worker
+    # changes them, and fans task board changes out to this worker's SSE clients
+    listener_task = asyncio.create_task(listen_for_notifications(engine.url, [schema_listener, board_listener]))
+    # Corrects progress rollups that drifted from the tasks table
+    progress_reconcile_task = asyncio.create_task(periodic_progress_reconcile(engine))
     
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
     
     # Cancel background task on shutdown
-    health_check_task.cancel()
-    try:
-        await health_check_task
-    except asyncio.CancelledError:
-        pass
+    for task in (health_check_task, listener_task, progress_reconcile_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
 
 
 app = FastAPI(lifespan=lifespan)
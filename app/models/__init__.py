@@ -2,6 +2,7 @@ from .base import Base
 from .user import User
 from .access_code import AccessCode
 from .project import Project
+from .project_dependency import ProjectDependency
 from .task import Task
 from .task_dependency import TaskDependency
 from .risk import Risk
@@ -9,3 +10,4 @@ from .scenario import Scenario
 from .conversation import ConversationLog
 from .version import ProjectVersion
 from .jira import JiraConnection
+from .custom_property import CustomProperty
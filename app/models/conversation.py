@@ -7,7 +7,7 @@ class ConversationLog(Base):
     __tablename__ = "conversation_logs"
     
     log_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id"), nullable=False)
+    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id", ondelete="CASCADE"), nullable=False, index=True)
     speaker: Mapped[str | None] = mapped_column(String(20), nullable=True)  # user, huzlr
     audio_path: Mapped[str | None] = mapped_column(Text(), nullable=True)
     transcript: Mapped[str | None] = mapped_column(Text(), nullable=True)
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, BigInteger, JSON, ForeignKey, UniqueConstraint
+from sqlalchemy import String, Integer, BigInteger, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from models.base import Base
 
 class PropertyPreference(Base):
@@ -8,7 +9,9 @@ class PropertyPreference(Base):
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"), nullable=False, index=True)
     entity_type: Mapped[str] = mapped_column(String(50), nullable=False)
-    preferences: Mapped[dict] = mapped_column(JSON, default=lambda: {})
+    preferences: Mapped[dict] = mapped_column(JSONB, default=lambda: {})
+    # Bumped on every change; keys the personalized schema cache and its ETag
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
 
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="property_preferences")
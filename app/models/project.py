@@ -1,5 +1,6 @@
-from sqlalchemy import String, Integer, BigInteger, Text, Float, ForeignKey, JSON, Enum as SAEnum
+from sqlalchemy import String, Integer, BigInteger, Text, Float, ForeignKey, Index, Computed, Enum as SAEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from datetime import datetime
 from models.base import Base
 import enum
@@ -38,7 +39,7 @@ class Project(Base):
     
     # Unified Properties Column (JSONB)
     # Stores all domain fields: title, status, description, etc.
-    properties: Mapped[dict] = mapped_column(JSON, default={}, server_default='{}')
+    properties: Mapped[dict] = mapped_column(JSONB, default={}, server_default='{}')
 
     # Linear-style Metadata
     lead_id: Mapped[int | None] = mapped_column(BigInteger, ForeignKey("users.id"), nullable=True)
@@ -50,25 +51,51 @@ class Project(Base):
 
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Progress rollup over the tasks of all the project's scenarios, kept current by task
+    # writes (core.progress.apply_progress) and corrected by the periodic reconciler
+    task_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    tasks_done: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    duration_total: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    duration_done: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
+    # Full-text search over title/summary/description, maintained by Postgres.
+    # Deferred so regular project loads don't ship the vector.
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(properties ->> 'project_title', '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(properties ->> 'short_summary', '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(properties ->> 'description', '')), 'C')",
+            persisted=True
+        ),
+        nullable=True,
+        deferred=True
+    )
     
     # Relationships
     user: Mapped["User"] = relationship("User", foreign_keys=[user_id], back_populates="projects")
     lead: Mapped["User"] = relationship("User", foreign_keys=[lead_id])
     
-    inputs: Mapped[list["ProjectInput"]] = relationship("ProjectInput", back_populates="project", cascade="all, delete-orphan")
+    inputs: Mapped[list["ProjectInput"]] = relationship("ProjectInput", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
     # intents relationship removed as part of consolidation
-    scenarios: Mapped[list["Scenario"]] = relationship("Scenario", back_populates="project", cascade="all, delete-orphan")
-    risks: Mapped[list["Risk"]] = relationship("Risk", back_populates="project", cascade="all, delete-orphan")
-    assumptions: Mapped[list["Assumption"]] = relationship("Assumption", back_populates="project", cascade="all, delete-orphan")
-    conversation_logs: Mapped[list["ConversationLog"]] = relationship("ConversationLog", back_populates="project", cascade="all, delete-orphan")
-    versions: Mapped[list["ProjectVersion"]] = relationship("ProjectVersion", back_populates="project", cascade="all, delete-orphan")
+    scenarios: Mapped[list["Scenario"]] = relationship("Scenario", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    risks: Mapped[list["Risk"]] = relationship("Risk", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    assumptions: Mapped[list["Assumption"]] = relationship("Assumption", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    conversation_logs: Mapped[list["ConversationLog"]] = relationship("ConversationLog", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    versions: Mapped[list["ProjectVersion"]] = relationship("ProjectVersion", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_projects_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_projects_search_vector", "search_vector", postgresql_using="gin"),
+    )
     
 
 class ProjectInput(Base):
     __tablename__ = "project_inputs"
     
     input_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id"), nullable=False)
+    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id", ondelete="CASCADE"), nullable=False, index=True)
     raw_audio_path: Mapped[str | None] = mapped_column(Text(), nullable=True)
     raw_transcript: Mapped[str | None] = mapped_column(Text(), nullable=True)
     cleaned_transcript: Mapped[str | None] = mapped_column(Text(), nullable=True)
@@ -0,0 +1,13 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, ForeignKey
+from models.base import Base
+
+class ProjectDependency(Base):
+    """
+    Edge table mirroring `properties.dependencies` of projects:
+    `project_id` depends on `depends_on_project_id`.
+    """
+    __tablename__ = "project_dependencies"
+
+    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id", ondelete="CASCADE"), primary_key=True)
+    depends_on_project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id", ondelete="CASCADE"), primary_key=True, index=True)
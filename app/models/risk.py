@@ -6,7 +6,7 @@ class Risk(Base):
     __tablename__ = "risks"
     
     risk_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id"), nullable=False)
+    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id", ondelete="CASCADE"), nullable=False, index=True)
     description: Mapped[str | None] = mapped_column(Text(), nullable=True)
     likelihood: Mapped[str | None] = mapped_column(String(20), nullable=True)  # low, medium, high
     impact: Mapped[str | None] = mapped_column(String(20), nullable=True)  # low, medium, high
@@ -20,7 +20,7 @@ class Assumption(Base):
     __tablename__ = "assumptions"
     
     assumption_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id"), nullable=False)
+    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id", ondelete="CASCADE"), nullable=False, index=True)
     description: Mapped[str | None] = mapped_column(Text(), nullable=True)
     
     # Relationships
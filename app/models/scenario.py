@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, Text, Date, ForeignKey
+from sqlalchemy import String, Integer, Text, Date, ForeignKey, Index
 from datetime import datetime, date
 from models.base import Base
 
@@ -7,30 +7,42 @@ class Scenario(Base):
     __tablename__ = "scenarios"
     
     scenario_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id"), nullable=False)
+    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id", ondelete="CASCADE"), nullable=False, index=True)
     scenario_type: Mapped[str] = mapped_column(String(20))  # optimistic, realistic, pessimistic
     description: Mapped[str | None] = mapped_column(Text(), nullable=True)
     estimated_start_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     estimated_end_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    # Bumped whenever the scenario's tasks or dependencies change; validates cached schedules
+    plan_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     
     # Relationships
     project: Mapped["Project"] = relationship("Project", back_populates="scenarios")
-    milestones: Mapped[list["Milestone"]] = relationship("Milestone", back_populates="scenario", cascade="all, delete-orphan")
-    tasks: Mapped[list["Task"]] = relationship("Task", back_populates="scenario")
+    milestones: Mapped[list["Milestone"]] = relationship("Milestone", back_populates="scenario", cascade="all, delete-orphan", passive_deletes=True, order_by="(Milestone.rank, Milestone.milestone_id)")
+    tasks: Mapped[list["Task"]] = relationship("Task", back_populates="scenario", passive_deletes=True, order_by="(Task.rank, Task.id)")
 
 
 class Milestone(Base):
     __tablename__ = "milestones"
     
     milestone_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    scenario_id: Mapped[int] = mapped_column(Integer, ForeignKey("scenarios.scenario_id"), nullable=False)
+    scenario_id: Mapped[int] = mapped_column(Integer, ForeignKey("scenarios.scenario_id", ondelete="CASCADE"), nullable=False, index=True)
     title: Mapped[str] = mapped_column(String(255))
     description: Mapped[str | None] = mapped_column(Text(), nullable=True)
-    order_index: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Fractional order key within the scenario (see core.ordering)
+    rank: Mapped[str] = mapped_column(String(collation="C"), default="a0")
     estimated_start_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     estimated_end_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    # Progress rollup over the milestone's tasks (see core.progress)
+    task_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    tasks_done: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    duration_total: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    duration_done: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     
     # Relationships
     scenario: Mapped["Scenario"] = relationship("Scenario", back_populates="milestones")
-    tasks: Mapped[list["Task"]] = relationship("Task", back_populates="milestone")
\ No newline at end of file
+    tasks: Mapped[list["Task"]] = relationship("Task", back_populates="milestone", passive_deletes=True, order_by="(Task.rank, Task.id)")
+
+    __table_args__ = (
+        Index("ix_milestones_scenario_id_rank", "scenario_id", "rank", "milestone_id"),
+    )
\ No newline at end of file
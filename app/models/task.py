@@ -2,7 +2,7 @@ from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy import String, Integer, Text
 from models.base import Base
 from sqlalchemy.orm import relationship
-from sqlalchemy import ForeignKey, Date, Boolean
+from sqlalchemy import ForeignKey, Date, Boolean, Index
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -12,13 +12,14 @@ class Task(Base):
     description: Mapped[str | None] = mapped_column(Text(), nullable=True)
     status: Mapped[str] = mapped_column(String(50), default="pending")
     # NEW: Fields for project management
-    milestone_id: Mapped[int | None] = mapped_column(ForeignKey("milestones.milestone_id"), nullable=True)
-    scenario_id: Mapped[int | None] = mapped_column(ForeignKey("scenarios.scenario_id"), nullable=True)
+    milestone_id: Mapped[int | None] = mapped_column(ForeignKey("milestones.milestone_id", ondelete="SET NULL"), nullable=True)
+    scenario_id: Mapped[int | None] = mapped_column(ForeignKey("scenarios.scenario_id", ondelete="SET NULL"), nullable=True)
     duration_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
     estimated_start_date: Mapped[Date | None] = mapped_column(Date, nullable=True)
     estimated_end_date: Mapped[Date | None] = mapped_column(Date, nullable=True)
     critical_path_flag: Mapped[bool] = mapped_column(Boolean, default=False)
-    order_index: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Fractional order key within the scenario (see core.ordering); compared bytewise
+    rank: Mapped[str] = mapped_column(String(collation="C"), default="a0")
 
     # Add these relationships
     milestone: Mapped["Milestone"] = relationship("Milestone", back_populates="tasks")
@@ -27,5 +28,12 @@ class Task(Base):
         "TaskDependency",
         foreign_keys="TaskDependency.task_id",
         back_populates="task",
-        cascade="all, delete-orphan"
-    )
\ No newline at end of file
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+    __table_args__ = (
+        # Keyset pagination on (rank, id) within a scenario or milestone, and neighbour lookups on moves
+        Index("ix_tasks_scenario_id_rank", "scenario_id", "rank", "id"),
+        Index("ix_tasks_milestone_id_rank", "milestone_id", "rank", "id"),
+    )
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, Text, ForeignKey
+from sqlalchemy import Integer, Text, Boolean, LargeBinary, ForeignKey, UniqueConstraint
 from datetime import datetime
 from models.base import Base
 
@@ -7,10 +7,18 @@ class ProjectVersion(Base):
     __tablename__ = "project_versions"
     
     version_id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id"), nullable=False)
+    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.project_id", ondelete="CASCADE"), nullable=False, index=True)
     version_number: Mapped[int] = mapped_column(Integer)
     change_summary: Mapped[str | None] = mapped_column(Text(), nullable=True)
+    # zstd-compressed JSON: the full state for checkpoints, otherwise a JSON Patch
+    # against the previous version (see core/versioning.py)
+    is_checkpoint: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
+    payload: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     
     # Relationships
-    project: Mapped["Project"] = relationship("Project", back_populates="versions")
\ No newline at end of file
+    project: Mapped["Project"] = relationship("Project", back_populates="versions")
+
+    __table_args__ = (
+        UniqueConstraint('project_id', 'version_number', name='uq_project_version_number'),
+    )
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Optional
+
+class ConversationLogResponse(BaseModel):
+    log_id: int
+    project_id: int
+    speaker: Optional[str] = None
+    audio_path: Optional[str] = None
+    transcript: Optional[str] = None
+    message_type: Optional[str] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
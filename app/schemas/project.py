@@ -1,19 +1,83 @@
-from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, computed_field, model_validator
 from datetime import datetime
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Mapping
 
-from core.property_factory import create_pydantic_model_from_schema
+from core.property_factory import get_compiled_validator, build_trusted_serializer
+from core.property_registry import TenantSchema
+from core.progress import progress_stats
+from schemas.scenario import ProgressStats, ScenarioDetailResponse
+from schemas.risk import RiskResponse, AssumptionResponse
+from schemas.conversation import ConversationLogResponse
 
 # Auto-generate properties model from registry (Unified - includes ALL fields)
-UnifiedProjectProperties = create_pydantic_model_from_schema("project")
+UnifiedProjectProperties = get_compiled_validator("project").model
+# Same properties for output, without the hidden ones
+UnifiedProjectResponseProperties = get_compiled_validator("project").response_model
 
-class ProjectStats(BaseModel):
-    scope: Optional[int] = None
-    completed: Optional[int] = None
-    progress: Optional[int] = None
+class ProjectStats(ProgressStats):
     target: Optional[str] = None
     limit: Optional[str] = None
 
+class ProjectAggregateGroup(BaseModel):
+    value: Optional[str] = None
+    count: int
+
+class ProjectAggregateResponse(BaseModel):
+    # property key -> counts per distinct value
+    groups: Dict[str, list[ProjectAggregateGroup]]
+
+class ProjectSearchHit(BaseModel):
+    project_id: int
+    project_title: Optional[str] = None
+    rank: float
+    # Matched fragment with terms wrapped in <b></b>
+    headline: Optional[str] = None
+
+class ProjectSearchResponse(BaseModel):
+    items: list[ProjectSearchHit]
+    # Pass back as `cursor` to fetch the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+class ProjectDependencies(BaseModel):
+    project_id: int
+    # Transitive, in topological order
+    upstream: list[int]
+    downstream: list[int]
+
+class ProjectDependencyEdge(BaseModel):
+    project_id: int
+    depends_on_project_id: int
+
+class ProjectDependencyGraph(BaseModel):
+    order: list[int]
+    edges: list[ProjectDependencyEdge]
+
+class ProjectImportError(BaseModel):
+    # 1-based data row (the CSV header is not counted)
+    row: int
+    errors: list[str]
+
+class ProjectImportResult(BaseModel):
+    imported: int
+    error_count: int
+    errors: list[ProjectImportError]
+
+class ProjectVersionResponse(BaseModel):
+    version_number: int
+    change_summary: Optional[str] = None
+    is_checkpoint: bool
+    created_at: datetime
+
+class ProjectVersionState(BaseModel):
+    version_number: int
+    # {"properties": {...}, "lead_id": ...} as of that version
+    state: Dict[str, Any]
+
+class ProjectVersionDiff(BaseModel):
+    from_version: int
+    to_version: int
+    patch: list[Dict[str, Any]]
+
 class ProjectBase(BaseModel):
     # This is still useful for internal typing but we are decoupling API from it
     pass
@@ -30,9 +94,46 @@ class ProjectUpdate(BaseModel):
 class ProjectResponse(BaseModel):
     project_id: int
     user_id: int
-    properties: UnifiedProjectProperties
+    properties: UnifiedProjectResponseProperties
     lead_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
+    # Progress counters, read off the project row and served as `stats`
+    task_count: int = Field(0, exclude=True)
+    tasks_done: int = Field(0, exclude=True)
+    duration_total: int = Field(0, exclude=True)
+    duration_done: int = Field(0, exclude=True)
     
     model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def stats(self) -> ProjectStats:
+        """Task progress rollup: scope = tasks, completed = done tasks, progress = % by duration."""
+        return ProjectStats(**progress_stats(self.task_count, self.tasks_done, self.duration_total, self.duration_done))
+
+class ProjectFullResponse(ProjectResponse):
+    scenarios: list[ScenarioDetailResponse] = []
+    risks: list[RiskResponse] = []
+    assumptions: list[AssumptionResponse] = []
+    # Most recent first
+    conversation_logs: list[ConversationLogResponse] = []
+
+
+PROJECT_RESPONSE_FIELDS = ("project_id", "user_id", "lead_id", "created_at", "updated_at")
+
+def trusted_project_response(
+    row: Mapping[str, Any],
+    include: Optional[tuple[str, ...]] = None,
+    schema: Optional[TenantSchema] = None
+) -> Dict[str, Any]:
+    """
+    Builds a ProjectResponse-shaped dict from a database row without pydantic validation.
+    Only for rows read back from the DB (validated on write); `include` limits the
+    properties to a sorted tuple of property keys (sparse fieldsets), and `schema`
+    adds the owner's custom properties. The row must carry the progress counters.
+    """
+    data = {field: row[field] for field in PROJECT_RESPONSE_FIELDS}
+    data["properties"] = build_trusted_serializer("project", include, schema)(row["properties"])
+    data["stats"] = progress_stats(row["task_count"], row["tasks_done"], row["duration_total"], row["duration_done"])
+    return data
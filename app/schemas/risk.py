@@ -0,0 +1,19 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+
+class RiskResponse(BaseModel):
+    risk_id: int
+    project_id: int
+    description: Optional[str] = None
+    likelihood: Optional[str] = None
+    impact: Optional[str] = None
+    mitigation_strategy: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class AssumptionResponse(BaseModel):
+    assumption_id: int
+    project_id: int
+    description: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
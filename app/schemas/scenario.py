@@ -0,0 +1,84 @@
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+from datetime import date, datetime
+from typing import Optional
+
+from core.progress import progress_stats
+from schemas.task import TaskResponse
+
+class ProgressStats(BaseModel):
+    scope: Optional[int] = None
+    completed: Optional[int] = None
+    progress: Optional[int] = None
+
+class MilestoneResponse(BaseModel):
+    milestone_id: int
+    scenario_id: int
+    title: str
+    description: Optional[str] = None
+    rank: str
+    estimated_start_date: Optional[date] = None
+    estimated_end_date: Optional[date] = None
+    # Progress counters, read off the milestone row and served as `stats`
+    task_count: int = Field(0, exclude=True)
+    tasks_done: int = Field(0, exclude=True)
+    duration_total: int = Field(0, exclude=True)
+    duration_done: int = Field(0, exclude=True)
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def stats(self) -> ProgressStats:
+        """Task progress rollup: scope = tasks, completed = done tasks, progress = % by duration."""
+        return ProgressStats(**progress_stats(self.task_count, self.tasks_done, self.duration_total, self.duration_done))
+
+class ScenarioResponse(BaseModel):
+    scenario_id: int
+    project_id: int
+    scenario_type: str
+    description: Optional[str] = None
+    estimated_start_date: Optional[date] = None
+    estimated_end_date: Optional[date] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ScenarioDetailResponse(ScenarioResponse):
+    milestones: list[MilestoneResponse] = []
+    tasks: list[TaskResponse] = []
+
+class TaskSchedule(BaseModel):
+    task_id: int
+    # Days from the scenario start
+    earliest_start: int
+    earliest_finish: int
+    latest_start: int
+    latest_finish: int
+    slack: int
+    critical: bool
+
+class CriticalPathResponse(BaseModel):
+    scenario_id: int
+    start_date: date
+    end_date: date
+    duration_days: int
+    # Critical tasks in topological order
+    critical_path: list[int]
+    tasks: list[TaskSchedule]
+
+class ForecastPercentiles(BaseModel):
+    p50: date
+    p80: date
+    p95: date
+
+class MilestoneForecast(ForecastPercentiles):
+    milestone_id: int
+    title: str
+
+class ScenarioForecastResponse(BaseModel):
+    scenario_id: int
+    samples: int
+    start_date: date
+    # Project completion date percentiles
+    finish: ForecastPercentiles
+    milestones: list[MilestoneForecast]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, field_validator
 from datetime import date
 from typing import Optional
 
@@ -9,19 +9,77 @@ class TaskBase(BaseModel):
     milestone_id: Optional[int] = None
     scenario_id: Optional[int] = None
     duration_days: Optional[int] = None
-    estimated_start_date: Optional[date] = None
-    estimated_end_date: Optional[date] = None
-    critical_path_flag: bool = False
-    order_index: Optional[int] = None
 
 class TaskCreate(TaskBase):
+    # Dates and the critical flag are owned by the schedule (see core.critical_path)
     pass
 
-class TaskUpdate(TaskBase):
+class TaskUpdate(BaseModel):
+    # Dates and the critical flag are owned by the schedule (see core.critical_path)
     title: Optional[str] = None
+    description: Optional[str] = None
     status: Optional[str] = None
+    milestone_id: Optional[int] = None
+    scenario_id: Optional[int] = None
+    duration_days: Optional[int] = None
+
+    @field_validator("title", "status")
+    @classmethod
+    def reject_null(cls, value: Optional[str]) -> str:
+        # Omit the field to keep it; the column can't be cleared
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
 
 class TaskResponse(TaskBase):
     id: int
+    estimated_start_date: Optional[date] = None
+    estimated_end_date: Optional[date] = None
+    critical_path_flag: bool = False
+    # Order key within the scenario; sort by (rank, id)
+    rank: str
     
     model_config = ConfigDict(from_attributes=True)
+
+class TaskPage(BaseModel):
+    items: list[TaskResponse]
+    # Pass back as `cursor` to fetch the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+class TaskBulkItem(TaskCreate):
+    # Client-side id, only meaningful within the request
+    temp_id: str
+
+class TaskBulkEdge(BaseModel):
+    # Temp ids of tasks in the same request, or ids of existing tasks
+    task: str | int
+    depends_on: str | int
+
+class TaskBulkCreate(BaseModel):
+    tasks: list[TaskBulkItem]
+    dependencies: list[TaskBulkEdge] = []
+
+class TaskBulkResult(BaseModel):
+    tasks: list[TaskResponse]
+    # temp_id -> created task id
+    ids: dict[str, int]
+
+class TaskDependencies(BaseModel):
+    task_id: int
+    depends_on: list[int]
+
+class MoveRequest(BaseModel):
+    # Exactly one: the item of the same scenario to place this one directly before or after
+    before_id: Optional[int] = None
+    after_id: Optional[int] = None
+
+class TaskImpactItem(TaskResponse):
+    # Dependency edges between this task and the queried one, along the shortest path
+    depth: int
+
+class TaskImpact(BaseModel):
+    task_id: int
+    direction: str
+    max_depth: int
+    # Nearest first
+    tasks: list[TaskImpactItem]
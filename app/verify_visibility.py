@@ -19,7 +19,7 @@ def test_visibility():
         {"key": "default_field", "type": PropertyType.TEXT, "label": "Default"}, # Should be visible
     ]
     
-    Model = create_pydantic_model_from_schema("test_entity")
+    Model = create_pydantic_model_from_schema("test_entity", exclude_hidden=True)
     
     data = {
         "visible_field": "I am visible",
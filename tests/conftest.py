@@ -0,0 +1,8 @@
+import os
+import sys
+from pathlib import Path
+
+# Modules import each other as top-level packages of app/, as main.py arranges
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+# core.database builds its engine at import time; no test connects to it
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/test")
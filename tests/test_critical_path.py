@@ -0,0 +1,78 @@
+import random
+from datetime import date
+
+import pytest
+
+from core.critical_path import CriticalPath
+from core.dag import CycleError
+
+START = date(2026, 1, 5)
+
+
+def snapshot(schedule):
+    return {
+        task_id: (schedule.es[task_id], schedule.ef[task_id], schedule.ls[task_id], schedule.lf[task_id])
+        for task_id in schedule.duration
+    }
+
+
+def rebuilt(schedule):
+    """The same plan scheduled from scratch."""
+    return CriticalPath(
+        START,
+        dict(schedule.duration),
+        {task_id: set(schedule.graph.pred[task_id]) for task_id in schedule.duration},
+    )
+
+
+def test_chain_with_a_parallel_branch():
+    # 1 -> 2 -> 4 and 1 -> 3 -> 4, where 3 has slack
+    schedule = CriticalPath(START, {1: 2, 2: 5, 3: 1, 4: 3}, {2: [1], 3: [1], 4: [2, 3]})
+    assert schedule.finish == 10
+    assert schedule.critical_path() == [1, 2, 4]
+    assert schedule.slack[3] == 4
+    assert schedule.dates(4) == (date(2026, 1, 12), date(2026, 1, 15), True)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_edits_match_a_full_recompute(seed):
+    rng = random.Random(seed)
+    durations = {task_id: rng.randint(0, 10) for task_id in range(30)}
+    predecessors = {task_id: rng.sample(range(task_id), min(task_id, rng.randint(0, 3))) for task_id in durations}
+    schedule = CriticalPath(START, durations, predecessors)
+    next_id = len(durations)
+
+    for _ in range(100):
+        before = snapshot(schedule)
+        action = rng.random()
+        if action < 0.4:
+            changed = schedule.set_duration(rng.choice(list(schedule.duration)), rng.choice([None, 0, 1, 4, 9]))
+        elif action < 0.8:
+            task_id = rng.choice(list(schedule.duration))
+            others = [other for other in schedule.duration if other != task_id]
+            try:
+                changed = schedule.set_predecessors(task_id, rng.sample(others, rng.randint(0, 3)))
+            except CycleError:
+                assert snapshot(schedule) == before
+                continue
+        else:
+            new_tasks = {next_id: rng.randint(0, 6)}
+            next_id += 1
+            edges = [(rng.choice(list(schedule.duration)), task_id) for task_id in new_tasks]
+            changed = schedule.add_dependencies(new_tasks, edges)
+
+        expected = rebuilt(schedule)
+        after = snapshot(schedule)
+        assert after == snapshot(expected)
+        assert schedule.finish == expected.finish
+        # Every task whose times moved is reported, so saving only `changed` is enough
+        assert {task_id for task_id in after if before.get(task_id) != after[task_id]} <= changed
+
+
+def test_rejected_dependencies_leave_the_schedule_untouched():
+    schedule = CriticalPath(START, {1: 1, 2: 2, 3: 3}, {2: [1], 3: [2]})
+    before = snapshot(schedule)
+    with pytest.raises(CycleError):
+        schedule.add_dependencies({4: 1}, [(4, 1), (3, 4)])
+    assert 4 not in schedule.duration
+    assert snapshot(schedule) == before
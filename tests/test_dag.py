@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from core.dag import IncrementalDAG, CycleError
+
+
+def reaches(succ, start, target):
+    stack, seen = [start], set()
+    while stack:
+        node = stack.pop()
+        if node == target:
+            return True
+        if node not in seen:
+            seen.add(node)
+            stack.extend(succ.get(node, ()))
+    return False
+
+
+def assert_order_respects_edges(graph):
+    for u, v in graph.edges:
+        assert graph.ord[u] < graph.ord[v]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_edges_keep_a_valid_order(seed):
+    rng = random.Random(seed)
+    graph = IncrementalDAG()
+    reference = {}
+    for _ in range(300):
+        u, v = rng.sample(range(40), 2)
+        edges_before = sorted(graph.edges)
+        if reaches(reference, v, u):
+            with pytest.raises(CycleError) as error:
+                graph.add_edge(u, v)
+            # Unchanged graph, and a real cycle through the new edge
+            assert sorted(graph.edges) == edges_before
+            path = error.value.path
+            assert path[0] == path[-1] == u and path[1] == v
+            assert all(graph.has_edge(a, b) for a, b in zip(path[1:], path[2:]))
+        else:
+            graph.add_edge(u, v)
+            reference.setdefault(u, set()).add(v)
+        assert_order_respects_edges(graph)
+
+
+def test_self_loop_is_a_cycle():
+    with pytest.raises(CycleError) as error:
+        IncrementalDAG().add_edge(1, 1)
+    assert error.value.path == [1, 1]
+
+
+def test_add_edges_is_atomic():
+    graph = IncrementalDAG()
+    graph.add_edges([(1, 2), (2, 3)])
+    with pytest.raises(CycleError) as error:
+        graph.add_edges([(3, 4), (4, 5), (3, 1)])
+    assert error.value.path == [3, 1, 2, 3]
+    assert sorted(graph.edges) == [(1, 2), (2, 3)]
+
+
+def test_distances_stop_at_max_depth():
+    graph = IncrementalDAG()
+    graph.add_edges([(1, 2), (2, 3), (3, 4), (1, 3)])
+    assert graph.distances(1, upstream=False) == {2: 1, 3: 1, 4: 2}
+    assert graph.distances(4, upstream=True, max_depth=1) == {3: 1}
+    assert graph.descendants(2) == {3, 4}
+    assert graph.ancestors(3) == {1, 2}
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from core.ordering import FIRST_RANK, _split, key_between, keys_between
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_inserts_stay_ordered(seed):
+    rng = random.Random(seed)
+    keys = [FIRST_RANK]
+    for _ in range(500):
+        position = rng.randint(0, len(keys))
+        before = keys[position - 1] if position > 0 else None
+        after = keys[position] if position < len(keys) else None
+        key = key_between(before, after)
+        _split(key)  # well-formed
+        assert (before is None or before < key) and (after is None or key < after)
+        keys.insert(position, key)
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+
+def test_appends_and_prepends_stay_short():
+    key = FIRST_RANK
+    for _ in range(2000):
+        key = key_between(key, None)
+    assert len(key) <= 3
+    key = FIRST_RANK
+    for _ in range(2000):
+        key = key_between(None, key)
+    assert len(key) <= 3
+
+
+def test_keys_between_are_increasing_and_inside_the_bounds():
+    for a, b in [(None, None), ("a0", None), (None, "a0"), ("a0", "a1"), ("a0", "a0V")]:
+        keys = keys_between(a, b, 50)
+        assert keys == sorted(set(keys)) and len(keys) == 50
+        assert a is None or a < keys[0]
+        assert b is None or keys[-1] < b
+
+
+def test_out_of_order_bounds_are_rejected():
+    with pytest.raises(ValueError):
+        key_between("a1", "a0")
+    with pytest.raises(ValueError):
+        key_between("a0", "a0")
@@ -0,0 +1,18 @@
+from core.dag import IncrementalDAG
+from core.project_dependencies import dependency_stamp
+
+
+def graph_of(nodes, edges):
+    graph = IncrementalDAG()
+    for node in nodes:
+        graph.add_node(node)
+    graph.add_edges(edges)
+    return graph
+
+
+def test_stamp_tracks_nodes_and_edges_not_insertion_order():
+    stamp = dependency_stamp(graph_of([1, 2, 3, 4], [(1, 2), (3, 4)]))
+    assert dependency_stamp(graph_of([4, 3, 2, 1], [(3, 4), (1, 2)])) == stamp
+    # Same edge count and endpoints, different edges
+    assert dependency_stamp(graph_of([1, 2, 3, 4], [(1, 4), (3, 2)])) != stamp
+    assert dependency_stamp(graph_of([1, 2, 3, 4, 5], [(1, 2), (3, 4)])) != stamp
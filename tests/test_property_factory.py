@@ -0,0 +1,26 @@
+from core.custom_properties import custom_property_definition
+from core.property_factory import build_trusted_serializer, get_compiled_validator, validate_properties
+from core.property_registry import TenantSchema, freeze_properties, get_frozen_schema, get_registry_version
+
+
+def tenant_schema(**definitions):
+    custom = [
+        {**custom_property_definition("project", key, definition), "key": key}
+        for key, definition in definitions.items()
+    ]
+    return TenantSchema(
+        entity_type="project",
+        properties=get_frozen_schema("project") + freeze_properties(custom),
+        fingerprint="-".join(sorted(definitions)),
+        registry_version=get_registry_version(),
+    )
+
+
+def test_hidden_properties_survive_validation_but_not_output():
+    schema = tenant_schema(secret_code={"type": "text", "label": "Secret", "visible": False})
+    validated = validate_properties("project", {"project_title": "x", "secret_code": "hello"}, schema)
+    assert validated == {"project_title": "x", "secret_code": "hello"}
+
+    response_model = get_compiled_validator("project", schema).response_model
+    assert "secret_code" not in response_model(**validated).model_dump()
+    assert "secret_code" not in build_trusted_serializer("project", schema=schema)(validated)